@@ -1,36 +1,242 @@
-# from service.helper import get_inputs
-from service.config_service import collect_user_config
-from service.config_service import create_transpiler_model
-from service.config_service import create_modify_model
-from service.config_service import create_upload_model
-from service.analyzer_service import run_analyzer
-from service.transpile_service import run_transpiler
-from service.modify_service import run_modify_and_create_notebooks
-from service.upload_service import UploadService
-from service.run_service import RunService
-
-
-def main():
-    config1 = collect_user_config()
-    # config = get_inputs()
-    run_analyzer(config1["analyzer"])
-    
-    config2 = create_transpiler_model()
-    
-    run_transpiler(config2)
-    
-    modify_cfg = create_modify_model()
-    run_modify_and_create_notebooks(modify_cfg)
-
-    upload_cfg = create_upload_model()
-    uploaded_paths = UploadService(upload_cfg).upload()
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+# Each subcommand imports only the modules it needs, so calling e.g. `analyze`
+# from a scheduler does not pay for groq/nbformat/nbconvert. `check-imports`
+# verifies that no stage loads DEFERRED_MODULES up front.
+STAGE_IMPORTS = {
+    "analyze": ["service.config_service", "service.analyzer_service"],
+    "transpile": ["service.config_service", "service.transpile_service"],
+    "modify": ["service.config_service", "service.modify_service"],
+    "upload": ["service.config_service", "service.upload_service"],
+    "run": ["service.config_service", "service.run_service"],
+    "reconcile": ["service.config_service", "service.reconcile_service"],
+    "serve": ["service.server_service"],
+    "gc": ["service.artifact_service"],
+    "reset": ["service.inventory_service"],
+    "lineage": ["service.lineage_service"],
+    "clear-validation-cache": ["service.validation_service"],
+}
+STAGE_IMPORTS["all"] = sorted({m for modules in STAGE_IMPORTS.values() for m in modules})
+# Imported by the code that uses them (LLM clients, notebooks, report parsing), never at module level
+DEFERRED_MODULES = (
+    "groq", "dotenv", "nbformat", "nbconvert", "zipfile", "xml.etree.ElementTree", "statistics",
+)
+
+
+def _import_stage(stage: str):
+    """Import a stage's modules and return them by their last name component."""
+    modules = STAGE_IMPORTS[stage]
+    return {name.rsplit(".", 1)[-1]: importlib.import_module(name) for name in modules}
+
+
+def run_analyze(args) -> None:
+    m = _import_stage("analyze")
+    config1 = m["config_service"].collect_user_config()
+    m["analyzer_service"].run_analyzer(config1["analyzer"])
+    # Later stages in the same run use the report for cost estimates
+    args.analyzer_report = args.analyzer_report or config1["analyzer"].report_file
+
+
+def run_transpile(args) -> None:
+    m = _import_stage("transpile")
+    config2 = m["config_service"].create_transpiler_model()
+    config2.analyzer_report = args.analyzer_report
+    m["transpile_service"].run_transpiler(config2)
+
+
+def run_modify(args) -> None:
+    m = _import_stage("modify")
+    modify_cfg = m["config_service"].create_modify_model()
+    modify_cfg.analyzer_report = args.analyzer_report
+    if args.plan:
+        catalog_name = schema_name = ""
+        if not modify_cfg.targets:
+            catalog_name, schema_name = importlib.import_module("service.helper").get_plan_namespace()
+        importlib.import_module("service.plan_service").plan_modify(modify_cfg, catalog_name, schema_name, args.force)
+        return
+    m["modify_service"].run_modify_and_create_notebooks(modify_cfg, force=args.force)
+
+
+def run_upload(args) -> None:
+    m = _import_stage("upload")
+    upload_cfg = m["config_service"].create_upload_model()
+    upload_cfg.analyzer_report = args.analyzer_report
+    if args.plan:
+        importlib.import_module("service.plan_service").plan_upload(upload_cfg, args.force)
+        return
     # Notebooks are imported to Databricks workspace and optionally executed via CLI
-    # when DATABRICKS_CLUSTER_ID is set. Local execution via RunService is skipped.
-    
-    #config3 = create_reconciler_model()
-   # run_reconciler(config3.reconciler)
-    #print(config.transpiler)
-    #print(config.reconciler)
-    
+    # when DATABRICKS_CLUSTER_ID is set.
+    m["upload_service"].UploadService(upload_cfg).upload(force=args.force)
+
+
+def run_notebook(args) -> None:
+    m = _import_stage("run")
+    run_cfg = m["config_service"].create_run_model(args.notebook_path)
+    m["run_service"].RunService(run_cfg).run()
+
+
+def run_reconcile(args) -> None:
+    m = _import_stage("reconcile")
+    reconcile_cfg = m["config_service"].create_reconciler_model()
+    m["reconcile_service"].run_reconciler(reconcile_cfg)
+
+
+def run_server(args) -> None:
+    m = _import_stage("serve")
+    m["server_service"].serve(args.host, args.port, args.workers, args.analyzer_report)
+
+
+def run_gc(args) -> None:
+    m = _import_stage("gc")
+    m["artifact_service"].collect_garbage(args.output_dir, args.keep, args.purge_legacy)
+
+
+def run_reset(args) -> None:
+    m = _import_stage("reset")
+    with m["inventory_service"].FileInventory() as inventory:
+        forgotten = inventory.reset(args.root, args.stage)
+    print(f"Forgot {forgotten} {args.stage or 'stage'} results under {os.path.abspath(args.root)}")
+
+
+def run_lineage(args) -> None:
+    m = _import_stage("lineage")
+    m["lineage_service"].show_lineage(args.output_dir, args.table, args.file)
+
+
+def run_clear_validation_cache(args) -> None:
+    m = _import_stage("clear-validation-cache")
+    m["validation_service"].clear_validation_cache(args.failures_only)
+
+
+def run_all(args) -> None:
+    if args.plan:
+        # Analyze/transpile/reconcile call external tools only, so a plan covers the LLM and upload stages
+        run_modify(args)
+        run_upload(args)
+        return
+    run_analyze(args)
+    run_transpile(args)
+    run_modify(args)
+    run_upload(args)
+    # Local execution via RunService is skipped; uploaded notebooks run on the cluster.
+    run_reconcile(args)
+
+
+def _probe_interpreter(modules) -> tuple:
+    """Import modules in a fresh interpreter; return (wall time in ms, names in sys.modules)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = "; ".join(["import sys"] + [f"import {name}" for name in modules] + ["print(' '.join(sys.modules))"])
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", probe], cwd=here, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    return elapsed, set(result.stdout.split())
+
+
+def check_imports(args) -> None:
+    """Check that no subcommand imports DEFERRED_MODULES and show its start-up cost.
+
+    The cost is the fastest of --repeat runs minus that of a bare interpreter,
+    so it is comparable between machines; only the module check can fail.
+    """
+    baseline = min(_probe_interpreter([])[0] for _ in range(args.repeat))
+    failed = []
+    for stage, modules in STAGE_IMPORTS.items():
+        try:
+            samples = [_probe_interpreter(modules) for _ in range(args.repeat)]
+        except ImportError as e:
+            print(f"{stage:<24} import failed: {e}")
+            failed.append(stage)
+            continue
+        loaded = sorted(set(DEFERRED_MODULES) & samples[0][1])
+        if loaded:
+            failed.append(stage)
+        status = f"LOADS {', '.join(loaded)}" if loaded else "ok"
+        elapsed = min(ms for ms, _ in samples) - baseline
+        print(f"{stage:<24} {elapsed:+7.1f} ms over a bare interpreter  {status}")
+    if failed:
+        sys.exit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="LakeBridge migration pipeline")
+    parser.add_argument(
+        "--analyzer-report", default="",
+        help=("Analyzer .xlsx report whose per-file complexity sets the order transpile, modify and upload work in, "
+              "heaviest first, and how transpile shards are balanced (default: file size)"),
+    )
+    plan_help = "Dry run for modify/upload/all: estimate LLM tokens, API calls, workspace imports and wall time"
+    parser.add_argument("--plan", action="store_true", help=plan_help)
+    force_help = "Modify/upload every file again, not only those changed or whose output was deleted"
+    parser.add_argument("--force", action="store_true", help=force_help)
+    subcommands = parser.add_subparsers(dest="command")
+
+    def add_plannable(name: str, help: str, func) -> None:
+        # Accept --plan/--force after the subcommand too; SUPPRESS keeps top-level flags from being reset
+        sub = subcommands.add_parser(name, help=help)
+        sub.add_argument("--plan", action="store_true", default=argparse.SUPPRESS, help=plan_help)
+        sub.add_argument("--force", action="store_true", default=argparse.SUPPRESS, help=force_help)
+        sub.set_defaults(func=func)
+
+    subcommands.add_parser("analyze", help="Run the LakeBridge analyzer").set_defaults(func=run_analyze)
+    subcommands.add_parser("transpile", help="Run the LakeBridge transpiler").set_defaults(func=run_transpile)
+    add_plannable("modify", "Qualify table names with an LLM and build notebooks", run_modify)
+    add_plannable("upload", "Import files into the Databricks workspace", run_upload)
+    run_parser = subcommands.add_parser("run", help="Execute a local notebook")
+    run_parser.add_argument("notebook_path")
+    run_parser.set_defaults(func=run_notebook)
+    subcommands.add_parser("reconcile", help="Compare source and target tables").set_defaults(func=run_reconcile)
+    add_plannable("all", "Run every stage in order (default)", run_all)
+    serve_parser = subcommands.add_parser("serve", help="Run modify jobs submitted over HTTP on a warm worker pool")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--workers", type=int, default=2, help="Jobs run concurrently")
+    serve_parser.set_defaults(func=run_server)
+    gc_parser = subcommands.add_parser("gc", help="Delete old generations of modified outputs from the artifact store")
+    gc_parser.add_argument("--output-dir", default="./transpiled", help="Modify output directory [default: ./transpiled]")
+    gc_parser.add_argument("--keep", type=int, default=3, help="Generations to keep per output [default: 3]")
+    gc_parser.add_argument(
+        "--purge-legacy", action="store_true",
+        help="Also delete timestamped modified_<name>_<YYYYMMDD_HHMMSS> files from earlier versions",
+    )
+    gc_parser.set_defaults(func=run_gc)
+    reset_parser = subcommands.add_parser(
+        "reset", help="Forget which files a stage has processed so the next run processes them again",
+    )
+    reset_parser.add_argument("root", help="Input directory of the stage, e.g. ./transpiled")
+    reset_parser.add_argument(
+        "--stage", choices=("modify", "upload"), default=None, help="Stage to reset [default: every stage]",
+    )
+    reset_parser.set_defaults(func=run_reset)
+    lineage_parser = subcommands.add_parser(
+        "lineage", help="Show which modified scripts touch a table, which tables a script touches, or the run order",
+    )
+    lineage_parser.add_argument("--output-dir", default="./transpiled", help="Modify output directory [default: ./transpiled]")
+    lineage_parser.add_argument("--table", default="", help="Table, optionally qualified (schema.table or catalog.schema.table)")
+    lineage_parser.add_argument("--file", default="", help="Source file relative to the modify input, e.g. loads/orders.sql")
+    lineage_parser.set_defaults(func=run_lineage)
+    clear_parser = subcommands.add_parser(
+        "clear-validation-cache", help="Forget cached statement validation results so they are checked again",
+    )
+    clear_parser.add_argument("--failures-only", action="store_true", help="Keep statements that passed")
+    clear_parser.set_defaults(func=run_clear_validation_cache)
+    check_parser = subcommands.add_parser("check-imports", help="Check that subcommands defer heavy imports and show their cost")
+    check_parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per subcommand; the fastest is kept")
+    check_parser.set_defaults(func=check_imports)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    func = getattr(args, "func", run_all)
+    func(args)
+
+
 if __name__ == "__main__":
     main()
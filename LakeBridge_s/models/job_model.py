@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+import time
+
+from models.modify_model import ModifyNotebookModel
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds") if timestamp else None
+
+
+@dataclass
+class TranslationJob:
+    """A modify run submitted to the service, with its progress and timings."""
+    id: str
+    config: ModifyNotebookModel
+    catalog: str = ""  # Unused when config.targets is set
+    schema: str = ""
+    status: str = "queued"  # queued -> running -> done / failed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # Seconds per phase
+    files: Dict[str, dict] = field(default_factory=dict)  # rel_path -> {"status", "seconds"[, "error"]}, filled as files finish
+    error: str = ""
+
+    def namespace(self) -> str:
+        """What the job writes into its output_dir: templates, or scripts for one catalog.schema."""
+        return "template" if self.config.targets else f"{self.catalog}.{self.schema}"
+
+    def to_dict(self, include_files: bool = True) -> dict:
+        # The worker adds entries while the job runs; copy before iterating
+        files = dict(self.files)
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "input_path": self.config.transpiled_dir,
+            "output_dir": self.config.output_dir,
+            "catalog": self.catalog,
+            "schema": self.schema,
+            "targets": [f"{t.catalog}.{t.schema}" for t in self.config.targets],
+            "submitted_at": _iso(self.submitted_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "timings": self.timings,
+            "files_processed": sum(1 for f in files.values() if f.get("status") in ("done", "failed")),
+            "files_failed": sum(1 for f in files.values() if f.get("status") == "failed"),
+            "error": self.error,
+        }
+        if include_files:
+            data["files"] = files
+        return data
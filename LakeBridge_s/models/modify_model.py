@@ -1,4 +1,33 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class RoutingRule:
+    """Send files up to the given size to a specific backend/model.
+
+    Rules are checked in order; the first one whose limits the file fits
+    within wins. A limit left as None is not checked.
+    """
+    model: str
+    backend: str = "groq"
+    max_lines: Optional[int] = None
+    max_chars: Optional[int] = None
+
+    def matches(self, line_count: int, char_count: int) -> bool:
+        if self.max_lines is not None and line_count > self.max_lines:
+            return False
+        if self.max_chars is not None and char_count > self.max_chars:
+            return False
+        return True
+
+
+@dataclass
+class NamespaceTarget:
+    """A (catalog, schema) deployment target and where its rendered scripts go."""
+    catalog: str
+    schema: str
+    output_dir: str
 
 
 @dataclass
@@ -7,5 +36,30 @@ class ModifyNotebookModel:
     output_dir: str
     llm_model: str
     temperature: float
+    stream: bool = False  # Consume LLM tokens as they arrive and write statements incrementally
+    backend: str = "groq"  # Default backend for files no routing rule matches: "groq" or "local"
+    local_base_url: str = "http://localhost:11434/v1"  # OpenAI-compatible endpoint for the "local" backend
+    routing_rules: List[RoutingRule] = field(default_factory=list)
+    include_globs: List[str] = field(default_factory=lambda: ["*.sql"])
+    # Generated files default to the same directory as their inputs, so skip them (and the
+    # artifact store behind them) on the next scan
+    exclude_globs: List[str] = field(default_factory=lambda: ["modified_*", ".artifacts"])
+    batch_chars: int = 12000  # Files larger than this are sent to the LLM in statement batches of about this size
+    # A notebook holds the whole script in memory, so larger outputs only get the .sql file
+    notebook_max_bytes: int = 64 << 20
+    workers: int = 1  # Files sent to the LLM concurrently
+    analyzer_report: str = ""  # See --analyzer-report
+    # With targets, output_dir holds target-neutral templates rendered into each target's own directory
+    targets: List[NamespaceTarget] = field(default_factory=list)
+
+    def route(self, sql_content: str) -> tuple:
+        """Return (backend, model) for a file based on its size."""
+        return self.route_size(sql_content.count("\n") + 1, len(sql_content))
+
+    def route_size(self, line_count: int, char_count: int) -> tuple:
+        for rule in self.routing_rules:
+            if rule.matches(line_count, char_count):
+                return rule.backend, rule.model
+        return self.backend, self.llm_model
 
 
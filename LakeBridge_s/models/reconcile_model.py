@@ -1,6 +1,21 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+@dataclass
+class TableMapping:
+    source_table: str
+    target_table: str
+    key_column: str                     # Numeric keys are split into ranges; others are compared as one partition
+    columns: Optional[List[str]] = None  # Defaults to every column of the source table
 
 @dataclass
 class ReconcilerModel:
     profile_name: str             
     target: str                   
+    source_connector: str = ""    # e.g. sqlite:///source.db or databricks://<warehouse_id>
+    target_connector: str = ""
+    tables: List[TableMapping] = field(default_factory=list)
+    partitions: int = 16          # Key ranges hashed per table
+    workers: int = 4              # Partitions compared in parallel
+    max_row_diffs: int = 100      # Row-level differences kept per table
+    report_file: str = "reconcile_report.json"
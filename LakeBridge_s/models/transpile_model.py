@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 
 @dataclass
 class TranspilerModel:
@@ -12,3 +13,8 @@ class TranspilerModel:
     warehouse: str         
     override: str         
     open_config: str     
+    workers: int = 1           # Parallel transpiler processes, each fed a cost-balanced shard of the input
+    analyzer_report: str = ""  # See --analyzer-report
+    # Which input files a sharded run (workers > 1) hands to the transpiler
+    include_globs: List[str] = field(default_factory=lambda: ["*"])
+    exclude_globs: List[str] = field(default_factory=list)
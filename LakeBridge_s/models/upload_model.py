@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 import os
 
 
@@ -6,6 +7,11 @@ import os
 class UploadModel:
     source_notebook_path: str  # File or directory
     destination_directory: str  # Databricks workspace dir, e.g., /Users/me/project
+    include_globs: List[str] = field(default_factory=lambda: ["*.ipynb", "*.py", "*.sql"])
+    # The artifact store holds every generation; only its current views are uploaded
+    exclude_globs: List[str] = field(default_factory=lambda: [".artifacts"])
+    workers: int = 1  # Concurrent workspace imports
+    analyzer_report: str = ""  # See --analyzer-report
 
     def validate(self) -> None:
         if not self.source_notebook_path:
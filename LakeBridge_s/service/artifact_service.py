@@ -0,0 +1,200 @@
+import os
+import re
+import shutil
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from service.inventory_service import _hash_file
+
+STORE_DIR = ".artifacts"
+_LEGACY_NAME = re.compile(r"^modified_.+_\d{8}_\d{6}\.(sql|ipynb)$")
+
+
+def _remove(path: str) -> None:
+    # Objects are read-only, which Windows refuses to delete
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+    os.remove(path)
+
+
+class ArtifactStore:
+    """Content-addressed storage for generated outputs under an output root.
+
+    Each output is stored once under ``.artifacts/objects/<hash>`` and made
+    read-only. The name callers and the upload stage see (the "current view",
+    e.g. ``modified_orders.sql``) points at the object of its latest
+    generation: a relative symlink, or a hard link or copy where symlinks are
+    not available. A new generation is only recorded when the content changed,
+    so rerunning on unchanged input adds nothing.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        self.store_dir = os.path.join(self.root, STORE_DIR)
+        self.objects_dir = os.path.join(self.store_dir, "objects")
+        self.tmp_dir = os.path.join(self.store_dir, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.store_dir, "manifest.db"), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS generations (
+                view TEXT NOT NULL,
+                generation INTEGER NOT NULL,
+                object TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (view, generation)
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ArtifactStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _view_key(self, view_path: str) -> str:
+        return os.path.relpath(os.path.abspath(view_path), self.root).replace(os.sep, "/")
+
+    def _object_path(self, object_name: str) -> str:
+        return os.path.join(self.objects_dir, object_name[:2], object_name)
+
+    def temp_path(self, suffix: str = "") -> str:
+        """A fresh path on the store's filesystem to write an output to before publish()."""
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.tmp_dir)
+        os.close(fd)
+        return path
+
+    def publish(self, temp_path: str, view_path: str) -> str:
+        """Move a finished temp file into the store and point view_path at it."""
+        object_name = _hash_file(temp_path) + os.path.splitext(view_path)[1]
+        object_path = self._object_path(object_name)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if os.path.exists(object_path):
+            os.remove(temp_path)  # Same content as an earlier output
+        else:
+            os.replace(temp_path, object_path)
+            os.chmod(object_path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+
+        key = self._view_key(view_path)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT generation, object FROM generations WHERE view = ? ORDER BY generation DESC LIMIT 1", (key,)
+            ).fetchone()
+            if row is None or row[1] != object_name:
+                self._conn.execute(
+                    "INSERT INTO generations (view, generation, object, created_at) VALUES (?, ?, ?, ?)",
+                    (key, (row[0] + 1) if row else 1, object_name, time.time()),
+                )
+        self._point_view(view_path, object_path)
+        return view_path
+
+    def publish_text(self, text: str, view_path: str) -> str:
+        temp_path = self.temp_path(os.path.splitext(view_path)[1])
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return self.publish(temp_path, view_path)
+
+    def unpublish(self, view_path: str) -> None:
+        """Remove a view that is no longer produced; its objects become garbage."""
+        if os.path.lexists(view_path):
+            os.remove(view_path)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM generations WHERE view = ?", (self._view_key(view_path),))
+
+    def _point_view(self, view_path: str, object_path: str) -> None:
+        view_dir = os.path.dirname(os.path.abspath(view_path))
+        os.makedirs(view_dir, exist_ok=True)
+        link_path = os.path.join(view_dir, f".{os.path.basename(view_path)}.{threading.get_ident()}.link")
+        try:
+            os.symlink(os.path.relpath(object_path, view_dir), link_path)
+        except (OSError, NotImplementedError):
+            try:
+                os.link(object_path, link_path)
+            except OSError:
+                shutil.copyfile(object_path, link_path)
+        # Swap atomically so readers never see a missing or half-written view
+        os.replace(link_path, view_path)
+
+    def current(self) -> Dict[str, str]:
+        """Return {view: object path} for the latest generation of every view."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT view, object FROM generations g WHERE generation = "
+                "(SELECT MAX(generation) FROM generations WHERE view = g.view)"
+            ).fetchall()
+        return {view: self._object_path(object_name) for view, object_name in rows}
+
+    def history(self, view_path: str) -> List[Tuple[int, str, float]]:
+        """Return (generation, object path, created_at) for a view, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT generation, object, created_at FROM generations WHERE view = ? ORDER BY generation DESC",
+                (self._view_key(view_path),),
+            ).fetchall()
+        return [(generation, self._object_path(name), created_at) for generation, name, created_at in rows]
+
+    def gc(self, keep: int) -> Tuple[int, int, int]:
+        """Forget all but the last keep generations of each view and delete unreferenced objects.
+
+        Returns (generations dropped, objects deleted, bytes freed).
+        """
+        keep = max(1, keep)
+        with self._lock, self._conn:
+            dropped = self._conn.execute(
+                "DELETE FROM generations WHERE generation <= "
+                "(SELECT MAX(generation) FROM generations g WHERE g.view = generations.view) - ?",
+                (keep,),
+            ).rowcount
+            referenced = {name for (name,) in self._conn.execute("SELECT DISTINCT object FROM generations")}
+
+        deleted = freed = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                if name not in referenced:
+                    path = os.path.join(dirpath, name)
+                    freed += os.path.getsize(path)
+                    _remove(path)
+                    deleted += 1
+        # Leftovers of writers interrupted before publish(); recent ones may still be in use
+        cutoff = time.time() - 3600
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        return dropped, deleted, freed
+
+
+def purge_legacy_outputs(root: str) -> int:
+    """Delete timestamped modified_<name>_<YYYYMMDD_HHMMSS> outputs written before the store existed."""
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != STORE_DIR]
+        for name in filenames:
+            if _LEGACY_NAME.match(name):
+                os.remove(os.path.join(dirpath, name))
+                removed += 1
+    return removed
+
+
+def collect_garbage(output_dir: str, keep: int, purge_legacy: bool = False) -> None:
+    if not os.path.isdir(os.path.join(output_dir, STORE_DIR)):
+        print(f"No artifact store in {output_dir}")
+        return
+    with ArtifactStore(output_dir) as store:
+        dropped, deleted, freed = store.gc(keep)
+        views = len(store.current())
+    print(
+        f"Kept the last {max(1, keep)} generation(s) of {views} outputs: dropped {dropped} generations, "
+        f"deleted {deleted} objects ({freed / (1 << 20):.1f} MiB)"
+    )
+    if purge_legacy:
+        print(f"Removed {purge_legacy_outputs(output_dir)} timestamped outputs from earlier versions")
@@ -3,14 +3,14 @@ from service.helper import (
     get_input_source, get_output_folder, get_error_file_path,
     get_catalog_name, get_schema_name, get_source_dialect,
     get_profile_name, get_target,get_validate, get_warehouse, get_override,
-    get_open_config
+    get_open_config, get_workers, get_namespace_targets
 )
 
 from models.analyzer_model import AnalyzerModel
 from models.transpile_model import TranspilerModel
-from models.reconcile_model import ReconcilerModel
+from models.reconcile_model import ReconcilerModel, TableMapping
 from models.full_config import FullConfigModel
-from models.modify_model import ModifyNotebookModel
+from models.modify_model import ModifyNotebookModel, NamespaceTarget, RoutingRule
 from models.upload_model import UploadModel
 from models.run_model import RunModel
 
@@ -25,17 +25,24 @@ def collect_user_config() -> FullConfigModel:
     
 def create_transpiler_model() ->  FullConfigModel:
     catalog = get_catalog_name()
+    source_dialect = get_source_dialect()
+    input_source = get_input_source()
+    output_folder = get_output_folder()
+    error_file_path = get_error_file_path()
+    schema_name = get_schema_name(catalog)
+    validate = get_validate()
     return TranspilerModel(
-        source_dialect=get_source_dialect(),
-        input_source=get_input_source(),
-        output_folder=get_output_folder(),
-        error_file_path=get_error_file_path(),
+        source_dialect=source_dialect,
+        input_source=input_source,
+        output_folder=output_folder,
+        error_file_path=error_file_path,
         catalog_name=catalog,
-        schema_name=get_schema_name(catalog),
-        validate=get_validate(),
-        warehouse=get_warehouse(),
+        schema_name=schema_name,
+        validate=validate,
+        warehouse=get_warehouse(required=validate == "true"),
         override=get_override(),
-        open_config=get_open_config()
+        open_config=get_open_config(),
+        workers=get_workers("transpiler processes"),
         )
     
     reconciler = ReconcilerModel(
@@ -65,11 +72,38 @@ def create_modify_model() -> ModifyNotebookModel:
     temperature_str = input("Enter temperature (0.0 - 1.0) [default: 0.6]: ").strip()
     temperature = 0.6 if not temperature_str else float(temperature_str)
 
+    stream_str = input("Stream LLM responses and write statements as they arrive? (yes/no) [default: no]: ").strip().lower()
+    stream = stream_str == "yes"
+
+    backend = input("Enter LLM backend (groq/local) [default: groq]: ").strip().lower() or "groq"
+    local_base_url = "http://localhost:11434/v1"
+    if backend == "local":
+        local_base_url = input(f"Enter local OpenAI-compatible endpoint [default: {local_base_url}]: ").strip() or local_base_url
+
+    routing_rules = []
+    small_model = input("Enter model for small files (blank to use one model for all files): ").strip()
+    if small_model:
+        max_lines_str = input("Send files with at most this many lines to the small model [default: 200]: ").strip()
+        routing_rules.append(RoutingRule(
+            model=small_model,
+            backend=backend,
+            max_lines=int(max_lines_str) if max_lines_str else 200,
+        ))
+
+    workers = get_workers("LLM requests")
+    targets = [NamespaceTarget(*target) for target in get_namespace_targets(output_dir)]
+
     return ModifyNotebookModel(
         transpiled_dir=transpiled_dir,
         output_dir=output_dir,
         llm_model=llm_model,
         temperature=temperature,
+        stream=stream,
+        backend=backend,
+        local_base_url=local_base_url,
+        routing_rules=routing_rules,
+        workers=workers,
+        targets=targets,
     )
 
 def create_upload_model() -> UploadModel:
@@ -78,6 +112,41 @@ def create_upload_model() -> UploadModel:
     return UploadModel(
         source_notebook_path=source_notebook_path,
         destination_directory=destination_directory,
+        workers=get_workers("uploads"),
+    )
+
+def create_reconciler_model() -> ReconcilerModel:
+    profile_name = get_profile_name()
+    target = get_target()
+
+    tables_str = input(
+        "Enter tables to reconcile as source_table[=target_table]:key_column, comma-separated (blank to skip): "
+    ).strip()
+    tables = []
+    for spec in filter(None, (t.strip() for t in tables_str.split(","))):
+        names, _, key_column = spec.rpartition(":")
+        source_table, _, target_table = names.partition("=")
+        tables.append(TableMapping(
+            source_table=source_table,
+            target_table=target_table or source_table,
+            key_column=key_column,
+        ))
+    if not tables:
+        return ReconcilerModel(profile_name=profile_name, target=target)
+
+    source_connector = input("Enter source connection (e.g., sqlite:///source.db): ").strip()
+    target_connector = input("Enter target connection (e.g., databricks://<warehouse_id>): ").strip()
+    partitions_str = input("Enter number of partitions per table [default: 16]: ").strip()
+    workers_str = input("Enter number of parallel workers [default: 4]: ").strip()
+
+    return ReconcilerModel(
+        profile_name=profile_name,
+        target=target,
+        source_connector=source_connector,
+        target_connector=target_connector,
+        tables=tables,
+        partitions=int(partitions_str) if partitions_str else 16,
+        workers=int(workers_str) if workers_str else 4,
     )
 
 def create_run_model(uploaded_notebook_path: str) -> RunModel:
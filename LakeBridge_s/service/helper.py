@@ -3,6 +3,7 @@
 from models.analyzer_model import AnalyzerModel
 from models.transpile_model import TranspilerModel
 from models.reconcile_model import ReconcilerModel
+import os
 import subprocess
 
 
@@ -98,6 +99,38 @@ def get_error_file_path():
         else:
             print("Error file path cannot be empty. Please try again.")
 
+def list_catalogs():
+    """Return the catalog names visible to the Databricks CLI."""
+    result = subprocess.run(
+        ['databricks', 'catalogs', 'list'],
+        capture_output=True, text=True, check=True
+    )
+    # Parse output: skip header lines and get first column
+    catalogs = []
+    for line in result.stdout.splitlines():
+        if line.startswith('---') or not line.strip():
+            continue
+        parts = line.split()
+        if parts:
+            catalogs.append(parts[0])
+    return catalogs
+
+def list_schemas(catalog_name):
+    """Return the schema names in a catalog, without the catalog prefix."""
+    result = subprocess.run(
+        ['databricks','schemas','list',catalog_name],
+        capture_output=True, text=True, check=True
+    )
+    return [line.split(maxsplit=1)[0].replace(f'{catalog_name}.', '') for line in result.stdout.splitlines()[1:] if line.strip()]
+
+def get_plan_namespace():
+    """Ask for the catalog/schema a planned run would use, without contacting Databricks."""
+    while True:
+        catalog, _, schema = input("Enter the catalog.schema the run will use (e.g., my_catalog.my_schema): ").strip().partition(".")
+        if catalog and schema:
+            return catalog, schema
+        print("Expected catalog.schema. Please try again.")
+
 def get_catalog_name():
     while True:
         val = input("Enter your catalog name (e.g., my_catalog): ").strip()
@@ -107,19 +140,7 @@ def get_catalog_name():
             
         # Validate catalog exists in Databricks
         try:
-            result = subprocess.run(
-                ['databricks', 'catalogs', 'list'],
-                capture_output=True, text=True, check=True
-            )
-            # Parse output: skip header lines and get first column
-            catalogs = []
-            for line in result.stdout.splitlines():
-                if line.startswith('---') or not line.strip():
-                    continue
-                parts = line.split()
-                if parts:
-                    catalogs.append(parts[0])
-                    
+            catalogs = list_catalogs()
             if val in catalogs:
                 return val
             else:
@@ -137,11 +158,7 @@ def get_schema_name(catalog_name):
             
         # Validate schema exists in the catalog
         try:
-            result = subprocess.run(
-                ['databricks','schemas','list',catalog_name],
-                capture_output=True, text=True, check=True
-            )
-            schemas = [line.split(maxsplit=1)[0].replace(f'{catalog_name}.', '') for line in result.stdout.splitlines()[1:] if line.strip()]
+            schemas = list_schemas(catalog_name)
             if val in schemas:
                 return val
             else:
@@ -155,12 +172,17 @@ def get_validate():
             return val if val else "false"
         else:
             print("Invalid input. Please enter 'true' or 'false'.")
-def get_warehouse():
+def get_warehouse(required=False):
+    # Validation explains every statement on this warehouse, so there is no default for it then
+    default = "" if required else " [default: none]"
     while True:
-        val = input("Enter your warehouse ID (e.g., 0123456789abcde0) [default: 1]: ").strip()
+        val = input(f"Enter your warehouse ID (e.g., 0123456789abcde0){default}: ").strip()
         if val == "":
-            return "1"
-            
+            if not required:
+                return ""
+            print("A warehouse ID is required to validate the transpiled code. Please try again.")
+            continue
+
         # Validate warehouse exists
         try:
             result = subprocess.run(
@@ -199,6 +221,37 @@ def get_open_config():
             print("Invalid input. Please enter 'yes' or 'no'.")
             
 
+def get_workers(what):
+    while True:
+        val = input(f"Enter number of parallel {what} [default: 1]: ").strip()
+        if val == "":
+            return 1
+        if val.isdigit() and int(val) > 0:
+            return int(val)
+        print("Invalid input. Please enter a positive whole number.")
+
+
+def get_namespace_targets(output_dir):
+    """Return [(catalog, schema, output_dir)] for multi-target rendering, or [] for a single target."""
+    from service.namespace_service import default_target_dir
+
+    while True:
+        val = input(
+            "Enter deployment targets as catalog.schema[=output_dir], comma-separated; output_dir "
+            f"defaults to {os.path.abspath(output_dir)}_<catalog>.<schema> (blank to use a single catalog/schema): "
+        ).strip()
+        targets = []
+        for spec in filter(None, (t.strip() for t in val.split(","))):
+            namespace, _, target_dir = spec.partition("=")
+            catalog, _, schema = namespace.strip().partition(".")
+            if not catalog or not schema:
+                print(f"Invalid target '{spec}'. Expected catalog.schema or catalog.schema=output_dir.")
+                break
+            targets.append((catalog, schema, target_dir.strip() or default_target_dir(output_dir, catalog, schema)))
+        else:
+            return targets
+
+
 def get_source_dialect():
     dialects = {
         "0": "Set it later",
@@ -0,0 +1,220 @@
+import fnmatch
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_INVENTORY_PATH = os.environ.get("LAKEBRIDGE_INVENTORY", os.path.join(".lakebridge", "inventory.db"))
+
+
+@dataclass
+class InventoryEntry:
+    root: str
+    rel_path: str  # Always uses "/" separators
+    size: int
+    mtime: float
+    content_hash: str
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.root, *self.rel_path.split("/"))
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _matches(rel_path: str, globs: Sequence[str]) -> bool:
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel_path, g) or fnmatch.fnmatch(name, g) for g in globs)
+
+
+def _walk(root: str, include: Sequence[str], exclude: Sequence[str], prefix: str = "") -> Iterator[Tuple[str, os.DirEntry]]:
+    with os.scandir(root) as it:
+        for entry in it:
+            rel_path = prefix + entry.name
+            if exclude and _matches(rel_path, exclude):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(entry.path, include, exclude, rel_path + "/")
+            elif entry.is_file() and _matches(rel_path, include):
+                yield rel_path, entry
+
+
+class FileInventory:
+    """Persistent record of the files each pipeline stage works on.
+
+    Every stage scans its input root through the same inventory, which keeps
+    (path, size, mtime, content hash) per file and the hash each stage last
+    processed successfully. Files whose size and mtime have not changed are
+    not re-hashed, so a rescan of an unchanged tree only costs a directory walk.
+
+    A read-only inventory (for dry runs) scans and answers needing() from the
+    recorded state but never writes it; mark() and reset() fail on it.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_INVENTORY_PATH, read_only: bool = False) -> None:
+        self.db_path = db_path
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        if read_only:
+            if os.path.exists(db_path):
+                from pathlib import Path
+
+                self._conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+                return
+            # Nothing recorded yet: every file counts as new
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            parent = os.path.dirname(db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                root TEXT NOT NULL,
+                rel_path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (root, rel_path)
+            );
+            CREATE TABLE IF NOT EXISTS stage_status (
+                root TEXT NOT NULL,
+                rel_path TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (root, rel_path, stage)
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "FileInventory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def scan(self, root: str, include: Sequence[str] = ("*",), exclude: Sequence[str] = ()) -> List[InventoryEntry]:
+        """Refresh the inventory for root and return its current matching files.
+
+        root may also be a single file, in which case it is the only entry.
+        Files that disappeared since the last scan are dropped. A read-only
+        inventory returns the same entries without recording anything.
+        """
+        single_file = os.path.isfile(root)
+        if single_file:
+            name = os.path.basename(root)
+            found = {name: os.stat(root)} if _matches(name, include) else {}
+            root = os.path.dirname(root) or "."
+        else:
+            found = {rel_path: entry.stat() for rel_path, entry in _walk(root, include, exclude)}
+        root = os.path.abspath(root)
+
+        with self._lock:
+            known = {
+                rel_path: (size, mtime, content_hash)
+                for rel_path, size, mtime, content_hash in self._conn.execute(
+                    "SELECT rel_path, size, mtime, content_hash FROM files WHERE root = ?", (root,)
+                )
+            }
+
+            entries: List[InventoryEntry] = []
+            changed = []
+            for rel_path, stat in sorted(found.items()):
+                previous = known.get(rel_path)
+                if previous is not None and previous[0] == stat.st_size and previous[1] == stat.st_mtime:
+                    content_hash = previous[2]
+                else:
+                    content_hash = _hash_file(os.path.join(root, *rel_path.split("/")))
+                    changed.append((root, rel_path, stat.st_size, stat.st_mtime, content_hash))
+                entries.append(InventoryEntry(root, rel_path, stat.st_size, stat.st_mtime, content_hash))
+
+            if self.read_only:
+                return entries
+            # Only forget files that vanished from the scanned set, not ones filtered out by globs
+            gone = [] if single_file else [
+                (root, rel_path) for rel_path in known
+                if rel_path not in found and _matches(rel_path, include)
+                and not (exclude and _matches(rel_path, exclude))
+            ]
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", changed)
+                self._conn.executemany("DELETE FROM files WHERE root = ? AND rel_path = ?", gone)
+                self._conn.executemany("DELETE FROM stage_status WHERE root = ? AND rel_path = ?", gone)
+        return entries
+
+    def needing(
+        self,
+        entries: Sequence[InventoryEntry],
+        stage: str,
+        output_exists: Optional[Callable[[InventoryEntry], bool]] = None,
+    ) -> List[InventoryEntry]:
+        """Return the entries stage has not yet completed for their current content.
+
+        With output_exists, a completed entry whose output has since been
+        deleted needs the stage again; it is only called for completed entries.
+        """
+        if not entries:
+            return []
+        root = entries[0].root
+        with self._lock:
+            done = {
+                (rel_path, content_hash)
+                for rel_path, content_hash in self._conn.execute(
+                    "SELECT rel_path, content_hash FROM stage_status WHERE root = ? AND stage = ? AND status = 'done'",
+                    (root, stage),
+                )
+            }
+        return [
+            e for e in entries
+            if (e.rel_path, e.content_hash) not in done or (output_exists is not None and not output_exists(e))
+        ]
+
+    def mark(self, entry: InventoryEntry, stage: str, status: str) -> None:
+        """Record the outcome of stage for entry ("done" or "failed")."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stage_status VALUES (?, ?, ?, ?, ?, ?)",
+                (entry.root, entry.rel_path, stage, status, entry.content_hash, time.time()),
+            )
+
+    def status(self, entry: InventoryEntry) -> dict:
+        """Return {stage: status} for entry."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT stage, status FROM stage_status WHERE root = ? AND rel_path = ?",
+                (entry.root, entry.rel_path),
+            ))
+
+    def reset(self, root: str, stage: Optional[str] = None) -> int:
+        """Forget stage results under root so every file is processed again.
+
+        stage also matches the keys derived from it, so "modify" forgets the
+        results for every output directory and namespace. Returns the number
+        of results forgotten.
+        """
+        # A single-file root is recorded under its directory, as in scan()
+        root = os.path.abspath(os.path.dirname(root) or "." if os.path.isfile(root) else root)
+        with self._lock, self._conn:
+            if stage is None:
+                cursor = self._conn.execute("DELETE FROM stage_status WHERE root = ?", (root,))
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM stage_status WHERE root = ? AND (stage = ? OR substr(stage, 1, ?) = ?)",
+                    (root, stage, len(stage) + 1, stage + ":"),
+                )
+            return cursor.rowcount
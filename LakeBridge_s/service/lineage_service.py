@@ -0,0 +1,289 @@
+import os
+import re
+import sqlite3
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from service.sql_stream import iter_sql_file_statements
+
+LINEAGE_DB_NAME = "lineage.db"
+
+# Operations that produce a table's contents; anything else is a read
+WRITE_OPS = ("create", "insert", "merge", "update", "delete")
+
+_IDENT = r"((?:[`\"\[]?[\w$]+[`\"\]]?)(?:\s*\.\s*[`\"\[]?[\w$]+[`\"\]]?){0,2})"
+_WRITE_PATTERNS = [
+    ("create", re.compile(
+        r"^\s*create\s+(?:or\s+replace\s+)?(?:(?:global\s+)?temp(?:orary)?\s+)?(?:materialized\s+)?"
+        r"(?:table|view)\s+(?:if\s+not\s+exists\s+)?" + _IDENT, re.IGNORECASE)),
+    # INSERT may follow a WITH clause, so it is not anchored to the statement start
+    ("insert", re.compile(r"\binsert\s+(?:into|overwrite)\s+(?:table\s+)?" + _IDENT, re.IGNORECASE)),
+    ("merge", re.compile(r"^\s*merge\s+into\s+" + _IDENT, re.IGNORECASE)),
+    ("update", re.compile(r"^\s*update\s+" + _IDENT, re.IGNORECASE)),
+    ("delete", re.compile(r"^\s*delete\s+from\s+" + _IDENT, re.IGNORECASE)),
+]
+# Parentheses and SELECTs are matched too, so FROM inside a function call such as
+# EXTRACT(YEAR FROM ts) or TRIM(BOTH ' ' FROM name) can be told apart from a subquery
+_READ_PATTERN = re.compile(r"(\()|(\))|\b(select)\b|\b(?:from|join)\s+" + _IDENT, re.IGNORECASE)
+# The source of a MERGE; USING elsewhere names a format (USING DELTA) or join columns
+_MERGE_SOURCE_PATTERN = re.compile(r"\busing\s+" + _IDENT, re.IGNORECASE)
+_CTE_PATTERN = re.compile(r"(?:\bwith|,)\s*(?:recursive\s+)?([\w$]+)\s+as\s*\(", re.IGNORECASE)
+_NOISE_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.)*'", re.DOTALL)
+
+
+def _normalize_table(name: str) -> str:
+    parts = [p.strip().strip('`"[]') for p in name.split(".")]
+    return ".".join(parts).lower()
+
+
+def _same_table(a: str, b: str) -> bool:
+    """True if two names refer to the same table, allowing either to be less qualified."""
+    return a == b or a.endswith("." + b) or b.endswith("." + a)
+
+
+def extract_table_refs(statement: str) -> List[Tuple[str, str]]:
+    """Return (op, table) pairs referenced by one SQL statement.
+
+    This is a pattern-based extraction, not a parser: it recognises the
+    statement's target (CREATE/INSERT/MERGE/UPDATE/DELETE), every table that
+    follows FROM or JOIN outside function-call parentheses and the USING
+    source of a MERGE. CTE names are not reported as tables.
+    """
+    text = _NOISE_PATTERN.sub(" ", statement)
+    refs: List[Tuple[str, str]] = []
+
+    target = None
+    for op, pattern in _WRITE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            target = _normalize_table(match.group(1))
+            refs.append((op, target))
+            break
+
+    reads = []
+    # One flag per open parenthesis: whether a SELECT has started inside it. The statement
+    # level always counts; inside parentheses only a subquery's FROM names a table.
+    in_query = [True]
+    for match in _READ_PATTERN.finditer(text):
+        opening, closing, select, table = match.groups()
+        if opening:
+            in_query.append(False)
+        elif closing:
+            if len(in_query) > 1:
+                in_query.pop()
+        elif select:
+            in_query[-1] = True
+        elif in_query[-1]:
+            reads.append(table)
+    if refs and refs[0][0] == "merge":
+        source = _MERGE_SOURCE_PATTERN.search(text)
+        if source:
+            reads.append(source.group(1))
+
+    ctes = {m.group(1).lower() for m in _CTE_PATTERN.finditer(text)}
+    seen: Set[str] = set()
+    for name in reads:
+        table = _normalize_table(name)
+        if table in ctes or table == target or table in seen:
+            continue
+        seen.add(table)
+        refs.append(("select", table))
+    return refs
+
+
+class LineageIndex:
+    """SQLite-backed index of which generated scripts create, write and read which tables.
+
+    Files are keyed by their source path relative to the modify input (e.g.
+    ``loads/orders_load.sql``), so re-indexing a source replaces its previous
+    entries. Generated scripts are stored relative to the directory holding
+    the index (the modify output directory) and returned as absolute paths,
+    so the index answers the same whatever the working directory.
+    """
+
+    # Index format; 1 stores script paths relative to the index's directory
+    _VERSION = 1
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self.base_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                source TEXT PRIMARY KEY,
+                sql_path TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS refs (
+                source TEXT NOT NULL,
+                stmt_no INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                short_name TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS refs_short_name ON refs (short_name);
+            CREATE INDEX IF NOT EXISTS refs_source ON refs (source);
+            """
+        )
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < self._VERSION:
+            # Earlier indexes stored paths as given, usually relative to the directory modify ran from
+            with self._conn:
+                for source, sql_path in self._conn.execute("SELECT source, sql_path FROM files").fetchall():
+                    self._conn.execute(
+                        "UPDATE files SET sql_path = ? WHERE source = ?", (self._stored_path(sql_path), source)
+                    )
+                self._conn.execute(f"PRAGMA user_version = {self._VERSION}")
+
+    def _stored_path(self, sql_path: str) -> str:
+        sql_path = os.path.abspath(sql_path)
+        try:
+            return os.path.relpath(sql_path, self.base_dir)
+        except ValueError:
+            # Another drive on Windows
+            return sql_path
+
+    def _full_path(self, stored: str) -> str:
+        return os.path.normpath(os.path.join(self.base_dir, stored))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "LineageIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def update_file(self, source: str, sql_path: str) -> bool:
+        """Re-index one file. Returns False if it was already indexed at this mtime/size."""
+        stat = os.stat(sql_path)
+        stored = self._stored_path(sql_path)
+        row = self._conn.execute(
+            "SELECT sql_path, mtime, size FROM files WHERE source = ?", (source,)
+        ).fetchone()
+        if row == (stored, stat.st_mtime, stat.st_size):
+            return False
+
+        rows = []
+        for stmt_no, statement in enumerate(iter_sql_file_statements(sql_path), start=1):
+            for op, table in extract_table_refs(statement):
+                rows.append((source, stmt_no, op, table, table.rsplit(".", 1)[-1]))
+
+        with self._conn:
+            self._conn.execute("DELETE FROM refs WHERE source = ?", (source,))
+            self._conn.executemany(
+                "INSERT INTO refs (source, stmt_no, op, table_name, short_name) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (source, sql_path, mtime, size) VALUES (?, ?, ?, ?)",
+                (source, stored, stat.st_mtime, stat.st_size),
+            )
+        return True
+
+    def sql_outputs(self) -> Dict[str, str]:
+        """Return the absolute path of the latest generated .sql for every indexed source."""
+        rows = self._conn.execute("SELECT source, sql_path FROM files")
+        return {source: self._full_path(sql_path) for source, sql_path in rows}
+
+    def prune(self, sources: Set[str]) -> List[str]:
+        """Drop every indexed file whose source is not in sources; returns the dropped names."""
+        gone = sorted(set(self.sql_outputs()) - set(sources))
+        for source in gone:
+            self.remove_file(source)
+        return gone
+
+    def remove_file(self, source: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM refs WHERE source = ?", (source,))
+            self._conn.execute("DELETE FROM files WHERE source = ?", (source,))
+
+    def files_for_table(self, table: str, ops: Optional[Tuple[str, ...]] = None) -> List[Tuple[str, str, int, str]]:
+        """Return (source, sql_path, stmt_no, op) for every statement touching table.
+
+        ``table`` may be partially qualified: ``sales.orders`` also matches
+        ``main.sales.orders``.
+        """
+        wanted = _normalize_table(table)
+        rows = self._conn.execute(
+            "SELECT r.source, f.sql_path, r.stmt_no, r.op, r.table_name FROM refs r "
+            "JOIN files f ON f.source = r.source WHERE r.short_name = ? ORDER BY r.source, r.stmt_no",
+            (wanted.rsplit(".", 1)[-1],),
+        ).fetchall()
+        return [
+            (source, self._full_path(sql_path), stmt_no, op)
+            for source, sql_path, stmt_no, op, name in rows
+            if (name == wanted or name.endswith("." + wanted)) and (ops is None or op in ops)
+        ]
+
+    def tables_for_file(self, source: str) -> List[Tuple[int, str, str]]:
+        """Return (stmt_no, op, table) for every reference in one file."""
+        return self._conn.execute(
+            "SELECT stmt_no, op, table_name FROM refs WHERE source = ? ORDER BY stmt_no", (source,)
+        ).fetchall()
+
+    def execution_waves(self) -> List[List[str]]:
+        """Order indexed files into waves that can each run in parallel.
+
+        A file that reads a table depends on every file that writes it, and a
+        file that inserts/merges/updates/deletes depends on the files that
+        create that table. Files caught in a dependency cycle are put together
+        in a final wave.
+        """
+        sources = [row[0] for row in self._conn.execute("SELECT source FROM files ORDER BY source")]
+        refs = self._conn.execute("SELECT DISTINCT source, op, table_name FROM refs").fetchall()
+        # Keyed by short name; partially qualified names are matched by suffix below
+        writers: Dict[str, List[Tuple[str, str, str]]] = defaultdict(list)
+        for source, op, table in refs:
+            if op in WRITE_OPS:
+                writers[table.rsplit(".", 1)[-1]].append((source, op, table))
+
+        depends_on: Dict[str, Set[str]] = {source: set() for source in sources}
+        for source, op, table in refs:
+            if op == "create":
+                continue
+            for writer, writer_op, writer_table in writers[table.rsplit(".", 1)[-1]]:
+                if op != "select" and writer_op != "create":
+                    continue
+                if _same_table(table, writer_table):
+                    depends_on[source].add(writer)
+        for source, deps in depends_on.items():
+            deps.discard(source)
+
+        waves: List[List[str]] = []
+        remaining = dict(depends_on)
+        done: Set[str] = set()
+        while remaining:
+            wave = sorted(s for s, deps in remaining.items() if deps <= done)
+            if not wave:
+                waves.append(sorted(remaining))
+                break
+            waves.append(wave)
+            done.update(wave)
+            for source in wave:
+                del remaining[source]
+        return waves
+
+
+def show_lineage(output_dir: str, table: str = "", source: str = "") -> None:
+    """Print the scripts touching a table, the tables a source touches, or else the execution waves."""
+    db_path = os.path.join(output_dir, LINEAGE_DB_NAME)
+    if not os.path.exists(db_path):
+        print(f"No lineage index in {output_dir}; run modify first")
+        return
+    with LineageIndex(db_path) as index:
+        if table:
+            rows = index.files_for_table(table)
+            print(f"{len(rows)} statements touch {table}:")
+            for row_source, sql_path, stmt_no, op in rows:
+                print(f"  {op:<7} {row_source} (statement {stmt_no}) -> {sql_path}")
+        if source:
+            rows = index.tables_for_file(source.replace("\\", "/"))
+            print(f"{source} touches {len({table_name for _, _, table_name in rows})} tables:")
+            for stmt_no, op, table_name in rows:
+                print(f"  statement {stmt_no:<5} {op:<7} {table_name}")
+        if not (table or source):
+            for wave_no, wave in enumerate(index.execution_waves(), start=1):
+                print(f"Wave {wave_no}: {', '.join(wave)}")
@@ -0,0 +1,316 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, List
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate a BPE tokenizer locally.
+
+    Words are charged one token per four characters and every punctuation
+    character one token, which tracks cl100k/llama tokenizers on SQL closely
+    enough for budgeting without downloading a vocabulary.
+    """
+    tokens = 0
+    for match in _TOKEN_RE.finditer(text):
+        piece = match.group()
+        tokens += math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1
+    return tokens
+
+
+@dataclass
+class BackendStats:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    estimated_calls: int = 0  # Calls whose usage was counted locally because the server never sent it
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, seconds: float, usage, estimated: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+            if estimated:
+                self.estimated_calls += 1
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def summary(self) -> str:
+        avg = self.seconds / self.calls if self.calls else 0.0
+        estimated = f" ({self.estimated_calls} calls estimated)" if self.estimated_calls else ""
+        return (
+            f"{self.name}: {self.calls} calls, {self.seconds:.1f}s total ({avg:.2f}s avg), "
+            f"{self.prompt_tokens} prompt / {self.completion_tokens} completion tokens{estimated}"
+        )
+
+
+def _to_namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+class _SSEStream:
+    """Iterate the ``data:`` events of an OpenAI-compatible streaming response.
+
+    release(reusable) is called once the stream is finished with: reusable is
+    True only if the response was read to its end, so the connection behind it
+    can serve the next request.
+    """
+
+    def __init__(self, response, release) -> None:
+        self._response = response
+        self._release = release
+        self._complete = False
+
+    def __iter__(self):
+        for raw in self._response:
+            line = raw.decode("utf-8").strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                self._response.read()
+                self._complete = True
+                break
+            yield _to_namespace(json.loads(data))
+        else:
+            self._complete = True
+
+    def close(self) -> None:
+        if self._release is not None:
+            release, self._release = self._release, None
+            release(self._complete)
+
+
+class _OpenAICompatibleClient:
+    """Minimal chat client for local OpenAI-compatible servers (Ollama, vLLM, llama.cpp).
+
+    Exposes the same ``client.chat.completions.create(...)`` shape as the Groq
+    SDK so callers do not care which backend they were handed. Each thread
+    keeps one keep-alive connection to the server; a stream closed before its
+    end takes its connection with it.
+    """
+
+    def __init__(self, base_url: str, api_key: str = "", timeout: float = 600) -> None:
+        from urllib.parse import urlsplit
+
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self._url = urlsplit(self.base_url)
+        self._local = threading.local()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+
+    def _connection(self):
+        # http.client is only needed once a local backend is used, so keep it out of module import
+        import http.client
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._url.scheme == "https" else http.client.HTTPConnection
+            conn = self._local.conn = cls(self._url.netloc, timeout=self.timeout)
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _post(self, body: bytes, headers: dict):
+        import http.client
+
+        path = f"{self._url.path}/chat/completions"
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed the idle keep-alive connection; retry once on a new one
+                self._drop_connection()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self._drop_connection()
+                raise
+            if response.status >= 400:
+                detail = response.read().decode("utf-8", "replace")
+                raise OSError(f"{self.base_url} returned HTTP {response.status}: {detail}")
+            return response
+
+    def _create_completion(self, model, messages, temperature, max_completion_tokens, top_p, stream, stop=None):
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_completion_tokens,
+            "top_p": top_p,
+            "stream": stream,
+        }
+        if stream:
+            # Without this, OpenAI-compatible servers send no token counts when streaming
+            payload["stream_options"] = {"include_usage": True}
+        if stop is not None:
+            payload["stop"] = stop
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        response = self._post(json.dumps(payload).encode("utf-8"), headers)
+        if stream:
+            return _SSEStream(response, lambda reusable: reusable or self._drop_connection())
+        return _to_namespace(json.loads(response.read()))
+
+
+class _TrackedStream:
+    """Wrap a completion stream so latency and usage are recorded when it ends.
+
+    Servers report usage on the last chunk, which a caller that stops reading
+    early (at the closing fence) never sees. The usage is then estimated from
+    the prompt and the text actually received.
+    """
+
+    def __init__(self, stream, stats: BackendStats, started: float, messages: list) -> None:
+        self._stream = stream
+        self._stats = stats
+        self._started = started
+        self._messages = messages
+        self._received: List[str] = []
+        self._usage = None
+        self._recorded = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                # Groq reports usage on the final chunk under x_groq; OpenAI-compatible servers use usage
+                usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage is not None:
+                    self._usage = usage
+                for choice in getattr(chunk, "choices", None) or []:
+                    content = getattr(getattr(choice, "delta", None), "content", None)
+                    if content:
+                        self._received.append(content)
+                yield chunk
+        finally:
+            self._record()
+
+    def close(self) -> None:
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+        self._record()
+
+    def _record(self) -> None:
+        if self._recorded:
+            return
+        self._recorded = True
+        usage = self._usage
+        if usage is None:
+            usage = SimpleNamespace(
+                prompt_tokens=sum(count_tokens(m.get("content") or "") for m in self._messages),
+                completion_tokens=count_tokens("".join(self._received)),
+            )
+        self._stats.record(time.perf_counter() - self._started, usage, estimated=self._usage is None)
+
+
+class LLMBackend:
+    """A named chat-completion backend with a lazily created, reused client."""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.stats = BackendStats(self.name)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _create_client(self):
+        raise NotImplementedError
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def create_completion(self, **kwargs):
+        started = time.perf_counter()
+        result = self.client.chat.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return _TrackedStream(result, self.stats, started, kwargs.get("messages") or [])
+        self.stats.record(time.perf_counter() - started, getattr(result, "usage", None))
+        return result
+
+
+class GroqBackend(LLMBackend):
+    name = "groq"
+
+    def _create_client(self):
+        from dotenv import load_dotenv
+        from groq import Groq
+
+        load_dotenv()
+        return Groq()
+
+
+class LocalBackend(LLMBackend):
+    name = "local"
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__()
+        self.base_url = base_url
+
+    def _create_client(self):
+        return _OpenAICompatibleClient(self.base_url, api_key=os.environ.get("LOCAL_LLM_API_KEY", ""))
+
+
+# Backends live for the whole process so clients (and their connection pools) are reused
+_BACKENDS: Dict[tuple, LLMBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_backend(name: str, local_base_url: str = "http://localhost:11434/v1") -> LLMBackend:
+    key = (name, local_base_url) if name == "local" else (name,)
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(key)
+        if backend is None:
+            if name == "groq":
+                backend = GroqBackend()
+            elif name == "local":
+                backend = LocalBackend(local_base_url)
+            else:
+                raise ValueError(f"Unknown LLM backend: {name}")
+            _BACKENDS[key] = backend
+        return backend
+
+
+def backend_usage() -> List[str]:
+    """One summary line per backend that has served at least one call."""
+    with _BACKENDS_LOCK:
+        backends = list(_BACKENDS.values())
+    return [backend.stats.summary() for backend in backends if backend.stats.calls]
+
+
+def print_backend_usage() -> None:
+    usage = backend_usage()
+    if not usage:
+        return
+    print("LLM backend usage:")
+    for line in usage:
+        print(f"  {line}")
@@ -1,11 +1,21 @@
 import os
-import nbformat
-from nbformat.v4 import new_notebook, new_code_cell
-from dotenv import load_dotenv
-from groq import Groq
+import posixpath
+import re
+import shutil
+import tempfile
+import time
 from models.modify_model import ModifyNotebookModel
 from service.helper import get_catalog_name, get_schema_name
-from datetime import datetime
+from service.llm_backend import LLMBackend, get_backend, print_backend_usage
+from service.sql_stream import StatementScanner, iter_statement_batches
+from service.lineage_service import LINEAGE_DB_NAME, LineageIndex
+from service.inventory_service import FileInventory
+from service.scheduling import CostModel, longest_first
+from service.namespace_service import CATALOG_PLACEHOLDER, SCHEMA_PLACEHOLDER, render_targets
+from service.artifact_service import ArtifactStore
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MAX_COMPLETION_TOKENS = 4096
 
 
 def _clean_sql_output(text: str) -> str:
@@ -54,40 +64,53 @@ def _clean_sql_output(text: str) -> str:
     return cleaned
 
 
-def _split_sql_statements(sql_text: str) -> list:
-    """Split SQL text into individual statements, keeping semicolons.
+class _StatementSplitter:
+    """Incremental form of the splitter behind _split_sql_statements.
 
-    This is a simple splitter that does not fully parse SQL, but works well for
-    typical scripts generated here. It respects basic string literals to avoid
-    splitting on semicolons inside single quotes.
+    Text may be fed in arbitrary chunks; each call to feed() returns the
+    statements completed by that chunk. Quote, escape and comment state
+    carries over between chunks, so a semicolon inside a literal or comment
+    that straddles two chunks is still ignored.
     """
-    statements = []
-    current = []
-    in_single_quote = False
-    escape_next = False
-
-    for char in sql_text:
-        current.append(char)
-        if escape_next:
-            escape_next = False
-            continue
-        if char == "\\":
-            escape_next = True
-            continue
-        if char == "'":
-            in_single_quote = not in_single_quote
-            continue
-        if char == ";" and not in_single_quote:
-            stmt = "".join(current).strip()
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._scan_pos = 0
+        self._scanner = StatementScanner()
+
+    def feed(self, text: str) -> list:
+        pending = self._pending + text
+        statements = []
+        start = 0
+
+        for end in self._scanner.scan(pending, self._scan_pos):
+            stmt = pending[start:end].strip()
             if stmt:
                 statements.append(stmt)
-            current = []
+            start = end
+
+        self._pending = pending[start:]
+        self._scan_pos = len(self._pending)
+        return statements
 
-    tail = "".join(current).strip()
-    if tail:
-        statements.append(tail if tail.endswith(";") else f"{tail};")
+    def finish(self) -> list:
+        tail = self._pending.strip()
+        self._pending = ""
+        self._scan_pos = 0
+        if not tail:
+            return []
+        return [tail if tail.endswith(";") else f"{tail};"]
 
-    return statements
+
+def _split_sql_statements(sql_text: str) -> list:
+    """Split SQL text into individual statements, keeping semicolons.
+
+    This is a simple splitter that does not fully parse SQL, but works well for
+    typical scripts generated here. It skips semicolons inside single-quoted
+    literals and comments.
+    """
+    splitter = _StatementSplitter()
+    return splitter.feed(sql_text) + splitter.finish()
 
 
 def _classify_statement(statement: str) -> str:
@@ -138,7 +161,224 @@ def _organize_sql_blocks(clean_sql: str) -> tuple:
     return ddl_block, dml_block, select_block
 
 
-def _save_modified_sql_to_notebook(modified_sql: str, sql_filename: str, output_dir: str) -> None:
+class _MalformedResponseError(ValueError):
+    """Raised when a streamed LLM response clearly does not contain SQL."""
+
+
+# Lines that look like the start of SQL; prose such as "With the qualified names, ..." matches
+# too, so an unfenced response is only taken as SQL once a line also ends a statement
+_SQL_LINE_RE = re.compile(
+    r"(create|drop|alter|insert|update|merge|delete|select|with|use|set|truncate|"
+    r"grant|declare|begin|comment|call)\b|--|/\*",
+    re.IGNORECASE,
+)
+
+
+class _StreamingSqlCleaner:
+    """Incremental counterpart of _clean_sql_output + _split_sql_statements.
+
+    Chunks of a streamed completion are fed in as they arrive. Complete lines
+    go through the same fence rules as _clean_sql_output and feed() returns
+    the statements they complete. ``done`` is set once the closing fence is
+    seen so the caller can drop the rest of the stream.
+
+    Lines before the first fence are held back until the response commits
+    to being unfenced SQL: a line looks like SQL and a line ends with ";".
+    They are then replayed, so the result matches _clean_sql_output on the
+    whole text. If neither a fence nor SQL shows up within ``probe_chars``
+    characters the response is treated as prose and _MalformedResponseError
+    is raised.
+    """
+
+    def __init__(self, probe_chars: int = 2048) -> None:
+        self.probe_chars = probe_chars
+        self.done = False
+        self._splitter = _StatementSplitter()
+        self._partial_line = ""
+        self._state = "probe"  # probe -> fenced | bare
+        self._probed_chars = 0
+        self._probe_lines = []
+        self._sql_seen = False
+        self._triple_quoted = False
+
+    def feed(self, chunk: str) -> list:
+        if self.done or not chunk:
+            return []
+        lines = (self._partial_line + chunk).split("\n")
+        self._partial_line = lines.pop()
+
+        statements = []
+        for line in lines:
+            statements.extend(self._handle_line(line))
+            if self.done:
+                break
+        return statements
+
+    def finish(self) -> list:
+        statements = []
+        if self._partial_line and not self.done:
+            statements.extend(self._handle_line(self._partial_line))
+        self._partial_line = ""
+        if self._state == "probe":
+            if not self._sql_seen:
+                raise _MalformedResponseError("Response did not contain any SQL")
+            statements.extend(self._commit_bare())
+        statements.extend(self._splitter.finish())
+        return statements
+
+    def _handle_line(self, line: str) -> list:
+        stripped = line.strip()
+        if self._state == "probe":
+            return self._probe_line(line, stripped)
+        if stripped.startswith("```"):
+            # Closing fence ends the first block; stray fences in bare SQL are dropped
+            if self._state == "fenced" and stripped == "```":
+                self.done = True
+            return []
+        if self._triple_quoted and stripped.endswith('"""'):
+            self.done = True
+            line = line.rstrip()[:-3]
+        return self._splitter.feed(line + "\n")
+
+    def _probe_line(self, line: str, stripped: str) -> list:
+        self._probed_chars += len(line) + 1
+        at_start = not any(l.strip() for l in self._probe_lines)
+        if at_start and not self._triple_quoted and stripped.startswith('"""'):
+            self._triple_quoted = True
+            line = stripped = stripped[3:].strip()
+
+        if stripped.startswith("```sql") or stripped == "```":
+            # Prose before the first fence is dropped
+            self._state = "fenced"
+            self._probe_lines = []
+            return []
+        self._probe_lines.append(line)
+        if _SQL_LINE_RE.match(stripped):
+            self._sql_seen = True
+        if self._sql_seen and stripped.endswith(";"):
+            return self._commit_bare()
+        if self._probed_chars > self.probe_chars:
+            if self._sql_seen:
+                return self._commit_bare()
+            raise _MalformedResponseError(
+                f"No SQL found in the first {self.probe_chars} characters of the response"
+            )
+        return []
+
+    def _commit_bare(self) -> list:
+        """Treat the response as unfenced SQL and replay the lines held back so far."""
+        self._state = "bare"
+        lines, self._probe_lines = self._probe_lines, []
+        while lines and not lines[0].strip():
+            lines.pop(0)
+        # As in _clean_sql_output, a leading descriptor line is not part of the SQL
+        if lines and lines[0].lstrip().startswith(("# Modified SQL from:", "Modified SQL from:")):
+            lines.pop(0)
+        statements = []
+        for line in lines:
+            statements.extend(self._handle_line(line))
+            if self.done:
+                break
+        return statements
+
+
+def _output_path(output_dir: str, sql_filename: str, ext: str) -> str:
+    """The stable name an output is published under (its view in the artifact store)."""
+    return os.path.join(output_dir, f"modified_{os.path.splitext(sql_filename)[0]}{ext}")
+
+
+def _entry_output_dir(output_dir: str, rel_path: str) -> str:
+    """Directory a source's outputs go to; it mirrors the input tree so equal names don't collide."""
+    rel_dir = posixpath.dirname(rel_path)
+    return os.path.join(output_dir, *rel_dir.split("/")) if rel_dir else output_dir
+
+
+def published_sql_exists(output_dir: str, rel_path: str) -> bool:
+    """Whether the modified .sql view for a source under output_dir is still there."""
+    file_name = posixpath.basename(rel_path)
+    return os.path.exists(_output_path(_entry_output_dir(output_dir, rel_path), file_name, ".sql"))
+
+
+class _StreamingSqlWriter:
+    """Write statements to per-kind spill files as soon as they complete.
+
+    commit() stitches the spills into the same layout _save_modified_sql_to_file
+    produces and publishes it to the artifact store; discard() removes them.
+    """
+
+    _KINDS = ("ddl", "dml", "select")
+
+    def __init__(self, sql_filename: str, output_dir: str, store: ArtifactStore) -> None:
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.splitext(sql_filename)[0]
+        self.sql_filename = sql_filename
+        self.output_dir = output_dir
+        self.store = store
+        self._spill_paths = {}
+        self._spills = {}
+        for kind in self._KINDS:
+            # Unique names: another writer (thread, job or process) may be spilling the same file name here
+            fd, self._spill_paths[kind] = tempfile.mkstemp(
+                prefix=f".modified_{base}.", suffix=f".{kind}.part", dir=output_dir
+            )
+            self._spills[kind] = os.fdopen(fd, "w", encoding="utf-8")
+        self._counts = dict.fromkeys(self._KINDS, 0)
+
+    @property
+    def statement_count(self) -> int:
+        return sum(self._counts.values())
+
+    def write(self, statement: str) -> None:
+        kind = _classify_statement(statement)
+        spill = self._spills[kind]
+        if self._counts[kind]:
+            spill.write("\n\n")
+        spill.write(statement.strip())
+        spill.flush()
+        self._counts[kind] += 1
+
+    def commit(self) -> str:
+        self._close_spills()
+        temp_path = self.store.temp_path(".sql")
+
+        with open(temp_path, "w", encoding="utf-8") as out:
+            written = False
+            for kind in self._KINDS:
+                if not self._counts[kind]:
+                    continue
+                if written:
+                    out.write("\n\n")
+                with open(self._spill_paths[kind], "r", encoding="utf-8") as spill:
+                    shutil.copyfileobj(spill, out)
+                written = True
+            out.write("\n")
+
+        self._remove_spills()
+        sql_out_path = self.store.publish(temp_path, _output_path(self.output_dir, self.sql_filename, ".sql"))
+        print(f"SQL file created: {sql_out_path}")
+        return sql_out_path
+
+    def discard(self) -> None:
+        self._close_spills()
+        self._remove_spills()
+
+    def _close_spills(self) -> None:
+        for spill in self._spills.values():
+            if not spill.closed:
+                spill.close()
+
+    def _remove_spills(self) -> None:
+        for path in self._spill_paths.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _save_modified_sql_to_notebook(modified_sql: str, sql_filename: str, output_dir: str, store: ArtifactStore) -> str:
+    # nbformat is only needed once a notebook is written, so keep it out of module import
+    import nbformat
+    from nbformat.v4 import new_notebook, new_code_cell
 
     notebook = new_notebook()
     clean_sql = _clean_sql_output(modified_sql)
@@ -154,24 +394,17 @@ def _save_modified_sql_to_notebook(modified_sql: str, sql_filename: str, output_
 
     # Always produce at least one cell to keep notebook valid
     notebook.cells = cells if cells else [new_code_cell("")]
-    current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-    notebook_filename = f"modified_{os.path.splitext(sql_filename)[0]}_{current_time}.ipynb"
-    notebook_path = os.path.join(output_dir, notebook_filename)
-
-    os.makedirs(output_dir, exist_ok=True)
-    with open(notebook_path, 'w', encoding='utf-8') as f:
+    temp_path = store.temp_path(".ipynb")
+    with open(temp_path, 'w', encoding='utf-8') as f:
         nbformat.write(notebook, f)
+    notebook_path = store.publish(temp_path, _output_path(output_dir, sql_filename, ".ipynb"))
 
     print(f"Notebook created: {notebook_path}")
+    return notebook_path
 
 
-def _save_modified_sql_to_file(modified_sql: str, sql_filename: str, output_dir: str) -> str:
+def _save_modified_sql_to_file(modified_sql: str, sql_filename: str, output_dir: str, store: ArtifactStore) -> str:
     """Save cleaned SQL to a .sql file and return its path."""
-    os.makedirs(output_dir, exist_ok=True)
-    current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-    sql_out_filename = f"modified_{os.path.splitext(sql_filename)[0]}_{current_time}.sql"
-    sql_out_path = os.path.join(output_dir, sql_out_filename)
-
     cleaned_sql = _clean_sql_output(modified_sql)
     ddl_block, dml_block, select_block = _organize_sql_blocks(cleaned_sql)
 
@@ -179,42 +412,16 @@ def _save_modified_sql_to_file(modified_sql: str, sql_filename: str, output_dir:
     blocks = [b for b in [ddl_block, dml_block, select_block] if b]
     final_text = ("\n\n".join(blocks) + "\n") if blocks else "\n"
 
-    with open(sql_out_path, 'w', encoding='utf-8') as f:
-        f.write(final_text)
-
+    sql_out_path = store.publish_text(final_text, _output_path(output_dir, sql_filename, ".sql"))
     print(f"SQL file created: {sql_out_path}")
     return sql_out_path
 
 
-def run_modify_and_create_notebooks(cfg: ModifyNotebookModel) -> None:
-
-    load_dotenv()
-    client = Groq()
-
-    catalog_name = get_catalog_name()
-    schema_name = get_schema_name(catalog_name)
-
-    transpiled_dir = cfg.transpiled_dir
-    output_dir = cfg.output_dir
-
-    if not os.path.exists(transpiled_dir):
-        print(f"Directory '{transpiled_dir}' not found!")
-        return
-
-    sql_files = [f for f in os.listdir(transpiled_dir) if f.endswith('.sql')]
-    if not sql_files:
-        print("No SQL files found in transpiled directory.")
-        return
-
-    print(f"Found {len(sql_files)} SQL files to process:")
-    for sql_file in sql_files:
-        print(f"Processing {sql_file}...")
-        try:
-            file_path = os.path.join(transpiled_dir, sql_file)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                sql_content = f.read()
-
-            prompt = f"""
+def _build_prompt(sql_content: str, catalog_name: str, schema_name: str) -> str:
+    placeholder_note = ""
+    if catalog_name == CATALOG_PLACEHOLDER:
+        placeholder_note = "\n- The catalog and schema above are placeholders; copy them exactly as written"
+    return f"""
 You are given SQL code that was transpiled using LakeBridge.
 
 Task:
@@ -222,33 +429,277 @@ Task:
 - If the table is referred to as just "table" or "schema.table", expand it to "catalog.schema.table"
 - Use the following defaults where not specified:
   - catalog: {catalog_name}
-  - schema: {schema_name}
+  - schema: {schema_name}{placeholder_note}
 - Do not explain anything or return extra text. Only return the modified SQL script.
 
 Here is the SQL code:
 {sql_content}
 """
 
-            completion = client.chat.completions.create(
-                model=cfg.llm_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=cfg.temperature,
-                max_completion_tokens=4096,
-                top_p=0.95,
-                stream=False,
-                stop=None,
-            )
 
-            modified_sql = completion.choices[0].message.content
-            # Save as plain .sql file and as a cleaned notebook for optional review
-            _save_modified_sql_to_file(modified_sql, sql_file, output_dir)
-            _save_modified_sql_to_notebook(modified_sql, sql_file, output_dir)
-            print(f"Successfully processed {sql_file}")
-            print("-" * 50)
-        except Exception as e:
-            print(f"Error processing {sql_file}: {str(e)}")
-            print("-" * 50)
+def _request_completion(backend: LLMBackend, model: str, cfg: ModifyNotebookModel, prompt: str, stream: bool):
+    return backend.create_completion(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=cfg.temperature,
+        max_completion_tokens=MAX_COMPLETION_TOKENS,
+        top_p=0.95,
+        stream=stream,
+        stop=None,
+    )
+
+
+def _stream_completion_into(backend: LLMBackend, model: str, cfg: ModifyNotebookModel, prompt: str, writer: "_StreamingSqlWriter") -> None:
+    """Stream one completion, writing statements to writer as they complete.
 
+    The stream is closed as soon as the closing fence arrives or the response
+    turns out to be malformed, so no further tokens are generated for it.
+    """
+    stream = _request_completion(backend, model, cfg, prompt, stream=True)
+    cleaner = _StreamingSqlCleaner()
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            for stmt in cleaner.feed(getattr(chunk.choices[0].delta, "content", None) or ""):
+                writer.write(stmt)
+            if cleaner.done:
+                break
+        for stmt in cleaner.finish():
+            writer.write(stmt)
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+def _stream_modified_sql(backend: LLMBackend, model: str, cfg: ModifyNotebookModel, prompt: str, sql_file: str, output_dir: str, store: ArtifactStore) -> str:
+    """Stream the completion for one file and return the path of the assembled .sql file."""
+    writer = _StreamingSqlWriter(sql_file, output_dir, store)
+    try:
+        _stream_completion_into(backend, model, cfg, prompt, writer)
+        if not writer.statement_count:
+            raise _MalformedResponseError("Response did not contain any SQL statements")
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.commit()
+
+
+def _file_size(file_path: str) -> tuple:
+    """Return (line count, size in bytes) of a file without holding it in memory."""
+    lines = 1
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+    return lines, os.path.getsize(file_path)
+
+
+def _modify_large_file(cfg: ModifyNotebookModel, file_path: str, sql_file: str, output_dir: str, catalog_name: str, schema_name: str, store: ArtifactStore) -> str:
+    """Modify a file too large for one prompt, batch by batch.
+
+    Statements are read through a memory map and sent in batches of about
+    cfg.batch_chars characters; the results go straight to spill files, so
+    memory stays bounded by the batch size rather than the file size. Every
+    batch goes to the backend the whole file routes to.
+    """
+    backend_name, model = cfg.route_size(*_file_size(file_path))
+    backend = get_backend(backend_name, cfg.local_base_url)
+    print(f"Using {backend_name} backend with model {model}")
+    writer = _StreamingSqlWriter(sql_file, output_dir, store)
+    try:
+        for batch_no, batch in enumerate(iter_statement_batches(file_path, cfg.batch_chars), start=1):
+            prompt = _build_prompt(batch, catalog_name, schema_name)
+            print(f"  Batch {batch_no}: {len(batch)} chars")
+            if cfg.stream:
+                _stream_completion_into(backend, model, cfg, prompt, writer)
+            else:
+                completion = _request_completion(backend, model, cfg, prompt, stream=False)
+                splitter = _StatementSplitter()
+                cleaned = _clean_sql_output(completion.choices[0].message.content)
+                for stmt in splitter.feed(cleaned) + splitter.finish():
+                    writer.write(stmt)
+        if not writer.statement_count:
+            raise _MalformedResponseError("Responses did not contain any SQL statements")
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.commit()
+
+
+def _process_sql_file(cfg: ModifyNotebookModel, file_path: str, sql_file: str, output_dir: str, catalog_name: str, schema_name: str, store: ArtifactStore) -> str:
+    """Modify one transpiled file and return the path of the generated .sql file."""
+    if os.path.getsize(file_path) > cfg.batch_chars:
+        print(f"{sql_file} is larger than {cfg.batch_chars} chars; processing in statement batches")
+        sql_out_path = _modify_large_file(cfg, file_path, sql_file, output_dir, catalog_name, schema_name, store)
+        if os.path.getsize(sql_out_path) > cfg.notebook_max_bytes:
+            store.unpublish(_output_path(output_dir, sql_file, ".ipynb"))
+            print(f"Skipped notebook for {sql_file}: output is larger than {cfg.notebook_max_bytes} bytes")
+        else:
+            with open(sql_out_path, 'r', encoding='utf-8') as f:
+                _save_modified_sql_to_notebook(f.read(), sql_file, output_dir, store)
+        return sql_out_path
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        sql_content = f.read()
+
+    prompt = _build_prompt(sql_content, catalog_name, schema_name)
+    backend_name, model = cfg.route(sql_content)
+    backend = get_backend(backend_name, cfg.local_base_url)
+    print(f"Using {backend_name} backend with model {model}")
+
+    if cfg.stream:
+        sql_out_path = _stream_modified_sql(backend, model, cfg, prompt, sql_file, output_dir, store)
+        with open(sql_out_path, 'r', encoding='utf-8') as f:
+            _save_modified_sql_to_notebook(f.read(), sql_file, output_dir, store)
+        return sql_out_path
+
+    completion = _request_completion(backend, model, cfg, prompt, stream=False)
+    modified_sql = completion.choices[0].message.content
+    # Save as plain .sql file and as a cleaned notebook for optional review
+    sql_out_path = _save_modified_sql_to_file(modified_sql, sql_file, output_dir, store)
+    _save_modified_sql_to_notebook(modified_sql, sql_file, output_dir, store)
+    return sql_out_path
+
+
+def modify_stage_key(output_dir: str, catalog_name: str, schema_name: str, templated: bool) -> str:
+    """Inventory stage under which a file counts as modified.
+
+    A file done for one output directory or namespace is not done for another,
+    and templated outputs are never interchangeable with concrete ones.
+    """
+    namespace = "template" if templated else f"{catalog_name}.{schema_name}"
+    return f"modify:{os.path.abspath(output_dir)}:{namespace}"
+
+
+def run_modify_and_create_notebooks(
+    cfg: ModifyNotebookModel,
+    catalog_name: str = None,
+    schema_name: str = None,
+    inventory: FileInventory = None,
+    costs: CostModel = None,
+    results: dict = None,
+    force: bool = False,
+) -> dict:
+    """Modify every changed file under cfg.transpiled_dir.
+
+    A file also counts as changed when its modified .sql output was deleted;
+    force processes every file again. The catalog/schema are prompted for
+    unless given (or targets are set).
+    Long-running callers pass their own inventory and cost model so they stay
+    open between runs. Returns {rel_path: {"status", "seconds"[, "error"]}} for
+    the files processed in this run; a results dict passed in is filled as
+    each file starts ("running") and finishes.
+    """
+    if cfg.targets:
+        # One target-neutral pass through the LLM; each target is rendered from it locally
+        catalog_name, schema_name = CATALOG_PLACEHOLDER, SCHEMA_PLACEHOLDER
+    elif not (catalog_name and schema_name):
+        catalog_name = get_catalog_name()
+        schema_name = get_schema_name(catalog_name)
+
+    transpiled_dir = cfg.transpiled_dir
+    output_dir = cfg.output_dir
+    results = {} if results is None else results
+
+    if not os.path.exists(transpiled_dir):
+        print(f"Directory '{transpiled_dir}' not found!")
+        return results
+
+    own_inventory = inventory is None
+    inventory = inventory or FileInventory()
+    entries = inventory.scan(transpiled_dir, include=cfg.include_globs, exclude=cfg.exclude_globs)
+    if not entries:
+        print("No SQL files found in transpiled directory.")
+        if own_inventory:
+            inventory.close()
+        return results
+
+    stage = modify_stage_key(output_dir, catalog_name, schema_name, bool(cfg.targets))
+
+    def output_exists(entry) -> bool:
+        return published_sql_exists(output_dir, entry.rel_path)
+
+    pending = entries if force else inventory.needing(entries, stage, output_exists)
+    # Heaviest files first so one large script picked up last doesn't set the wall time
+    costs = costs or CostModel(cfg.analyzer_report)
+    pending = longest_first(pending, lambda e: costs.cost(e.path))
+    lineage = LineageIndex(os.path.join(output_dir, LINEAGE_DB_NAME))
+    # Outputs are stored by content hash; modified_<name>.sql/.ipynb point at the latest generation
+    store = ArtifactStore(output_dir)
+    # Sources deleted or excluded since the last run must not keep their tables in the waves,
+    # nor their outputs (or, through them, rendered targets) in the output directory
+    previous_outputs = lineage.sql_outputs()
+    removed = lineage.prune({entry.rel_path for entry in entries})
+    for source in removed:
+        store.unpublish(previous_outputs[source])
+        store.unpublish(os.path.splitext(previous_outputs[source])[0] + ".ipynb")
+    if removed:
+        print(f"Dropped {len(removed)} files no longer in {transpiled_dir} and their outputs: {', '.join(removed)}")
+
+    seconds = {}
+
+    def modify_entry(entry) -> str:
+        print(f"Processing {entry.rel_path}...")
+        results[entry.rel_path] = {"status": "running"}
+        started = time.perf_counter()
+        file_name = posixpath.basename(entry.rel_path)
+        file_output_dir = _entry_output_dir(output_dir, entry.rel_path)
+        try:
+            return _process_sql_file(cfg, entry.path, file_name, file_output_dir, catalog_name, schema_name, store)
+        finally:
+            seconds[entry.rel_path] = round(time.perf_counter() - started, 3)
+
+    print(f"Found {len(entries)} SQL files, {len(pending)} changed since the last run:")
+    with ThreadPoolExecutor(max_workers=max(1, cfg.workers)) as pool:
+        futures = {pool.submit(modify_entry, entry): entry for entry in pending}
+        for future in as_completed(futures):
+            entry = futures[future]
+            sql_file = entry.rel_path
+            try:
+                sql_out_path = future.result()
+                lineage.update_file(sql_file, sql_out_path)
+                inventory.mark(entry, stage, "done")
+                results[sql_file] = {"seconds": seconds[sql_file], "status": "done"}
+                print(f"Successfully processed {sql_file}")
+                print("-" * 50)
+            except _MalformedResponseError as e:
+                inventory.mark(entry, stage, "failed")
+                results[sql_file] = {"seconds": seconds[sql_file], "status": "failed", "error": str(e)}
+                print(f"Aborted {sql_file}: {str(e)}")
+                print("-" * 50)
+            except Exception as e:
+                inventory.mark(entry, stage, "failed")
+                results[sql_file] = {"seconds": seconds[sql_file], "status": "failed", "error": str(e)}
+                print(f"Error processing {sql_file}: {str(e)}")
+                print("-" * 50)
+    store.close()
+
+    waves = lineage.execution_waves()
+    sql_outputs = lineage.sql_outputs()
+    lineage.close()
+    print(f"Lineage index updated: {os.path.join(output_dir, LINEAGE_DB_NAME)} ({len(waves)} execution waves)")
+    for wave_no, wave in enumerate(waves, start=1):
+        print(f"  Wave {wave_no}: {', '.join(wave)}")
+
+    if cfg.targets:
+        # Every template is rendered, not just this run's, so a newly added target is complete.
+        # Only outputs finished in template mode qualify; anything else would carry a real namespace.
+        not_done = {entry.rel_path for entry in inventory.needing(entries, stage, output_exists)}
+        by_source = {entry.rel_path: entry for entry in entries}
+        templates = {
+            source: path for source, path in sql_outputs.items()
+            if source in by_source and source not in not_done
+        }
+        for source in render_targets(output_dir, templates, cfg.targets, cfg.workers):
+            # Force the LLM pass again on the next run
+            inventory.mark(by_source[source], stage, "failed")
+
+    if own_inventory:
+        inventory.close()
+
+    print_backend_usage()
     print("Processing complete!")
+    return results
 
 
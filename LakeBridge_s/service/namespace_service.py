@@ -0,0 +1,113 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from models.modify_model import NamespaceTarget
+from service.lineage_service import extract_table_refs
+from service.sql_stream import iter_sql_file_statements
+
+# Stand-ins the LLM writes instead of a real catalog/schema. They are plain
+# identifiers, so the statement splitter and lineage index treat them like any
+# other name.
+CATALOG_PLACEHOLDER = "__LB_CATALOG__"
+SCHEMA_PLACEHOLDER = "__LB_SCHEMA__"
+
+_PLAIN_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_PLACEHOLDERS = re.compile(re.escape(CATALOG_PLACEHOLDER) + "|" + re.escape(SCHEMA_PLACEHOLDER))
+
+
+def _quote(name: str) -> str:
+    # Names with e.g. hyphens must be backtick-quoted in Databricks SQL
+    return name if _PLAIN_IDENT.match(name) else "`" + name.replace("`", "``") + "`"
+
+
+def render_text(text: str, target: NamespaceTarget) -> str:
+    """Replace the namespace placeholders in text with the target's catalog and schema."""
+    values = {CATALOG_PLACEHOLDER: _quote(target.catalog), SCHEMA_PLACEHOLDER: _quote(target.schema)}
+    return _PLACEHOLDERS.sub(lambda m: values[m.group()], text)
+
+
+def render_file(template_path: str, output_path: str, target: NamespaceTarget) -> None:
+    """Render one template line by line, so memory stays flat for large scripts."""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(template_path, "r", encoding="utf-8", newline="") as src, \
+            open(output_path, "w", encoding="utf-8", newline="") as dst:
+        for line in src:
+            dst.write(render_text(line, target))
+
+
+def contains_placeholders(path: str) -> bool:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return any(_PLACEHOLDERS.search(line) for line in f)
+
+
+def _is_template(sql_path: str) -> bool:
+    """True if the script is safe to render: it uses the placeholders, or names no tables at all."""
+    if contains_placeholders(sql_path):
+        return True
+    return not any(extract_table_refs(statement) for statement in iter_sql_file_statements(sql_path))
+
+
+def default_target_dir(output_dir: str, catalog: str, schema: str) -> str:
+    # A sibling of output_dir, so uploading output_dir never picks up other targets' trees
+    output_dir = os.path.abspath(output_dir)
+    return f"{output_dir}_{catalog}.{schema}"
+
+
+def _remove_stale_targets(template_root: str, target: NamespaceTarget) -> List[str]:
+    """Delete rendered scripts in a target whose template is gone; returns their relative paths."""
+    removed = []
+    for dirpath, _, filenames in os.walk(target.output_dir):
+        for name in filenames:
+            if not (name.startswith("modified_") and name.endswith((".sql", ".ipynb"))):
+                continue
+            path = os.path.join(dirpath, name)
+            rel_path = os.path.relpath(path, target.output_dir)
+            if not os.path.exists(os.path.join(template_root, rel_path)):
+                os.remove(path)
+                removed.append(rel_path.replace(os.sep, "/"))
+    return sorted(removed)
+
+
+def render_targets(template_root: str, templates: Dict[str, str], targets: List[NamespaceTarget], workers: int = 1) -> List[str]:
+    """Render templates ({source: .sql path}) into every target's output directory.
+
+    Each target mirrors the template tree under its own output_dir. No LLM is
+    involved, so adding a target later only costs this local pass. Scripts
+    that name tables without the placeholders were not produced as templates
+    and are refused rather than rendered with the wrong namespace; so are
+    sources whose template is missing. Their sources are returned. Rendered
+    scripts whose template no longer exists are deleted from every target.
+    """
+    refused = []
+    files = []
+    for source, sql_path in sorted(templates.items()):
+        if not os.path.isfile(sql_path):
+            print(f"Not rendering {source}: template {sql_path} is missing")
+            refused.append(source)
+            continue
+        if not _is_template(sql_path):
+            print(f"Not rendering {source}: {sql_path} has no {CATALOG_PLACEHOLDER}/{SCHEMA_PLACEHOLDER} placeholders")
+            refused.append(source)
+            continue
+        files.append(sql_path)
+        notebook_path = os.path.splitext(sql_path)[0] + ".ipynb"
+        if os.path.isfile(notebook_path):
+            files.append(notebook_path)
+
+    jobs: List[Tuple[str, str, NamespaceTarget]] = [
+        (path, os.path.join(target.output_dir, os.path.relpath(path, template_root)), target)
+        for target in targets
+        for path in files
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # list() surfaces the first rendering error instead of dropping it
+        list(pool.map(lambda job: render_file(*job), jobs))
+
+    for target in targets:
+        print(f"Rendered {len(files)} files for {target.catalog}.{target.schema} into {target.output_dir}")
+        stale = _remove_stale_targets(template_root, target)
+        if stale:
+            print(f"Removed {len(stale)} files whose template is gone from {target.output_dir}: {', '.join(stale)}")
+    return refused
@@ -0,0 +1,150 @@
+import heapq
+import os
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from models.modify_model import ModifyNotebookModel
+from models.upload_model import UploadModel
+from service.inventory_service import FileInventory
+from service.llm_backend import count_tokens
+from service.modify_service import MAX_COMPLETION_TOKENS, _build_prompt, modify_stage_key, published_sql_exists
+from service.scheduling import CostModel, longest_first
+from service.sql_stream import iter_statement_batches
+
+# Rough throughput figures used to project wall time. They are deliberately
+# simple; adjust them to what the backend and workspace actually deliver.
+LLM_CALL_OVERHEAD_S = 0.5
+LLM_OUTPUT_TOKENS_PER_S = 250.0
+CLI_CALL_S = 1.5
+# Namespace expansion makes the output a little longer than the input
+COMPLETION_GROWTH = 1.15
+
+@dataclass
+class FilePlan:
+    rel_path: str
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    largest_completion: int
+    seconds: float
+
+    @property
+    def over_limit(self) -> bool:
+        return self.largest_completion > MAX_COMPLETION_TOKENS
+
+
+def _project_wall_time(durations: Sequence[float], workers: int) -> float:
+    """Makespan of running durations longest-first on the given number of workers."""
+    loads = [0.0] * max(1, workers)
+    for duration in sorted(durations, reverse=True):
+        heapq.heapreplace(loads, loads[0] + duration)
+    return max(loads)
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+def plan_modify(
+    cfg: ModifyNotebookModel, catalog_name: str = "", schema_name: str = "", force: bool = False,
+) -> List[FilePlan]:
+    """Estimate LLM calls and tokens for the modify stage without calling any service.
+
+    catalog_name/schema_name are the namespace the real run would use (ignored
+    with targets); they decide which files the run would consider done.
+    force plans every file, as the run with --force would process them all.
+    """
+    if not os.path.exists(cfg.transpiled_dir):
+        print(f"Directory '{cfg.transpiled_dir}' not found!")
+        return []
+
+    # A plan must not change what the next real run considers new or removed
+    with FileInventory(read_only=True) as inventory:
+        entries = inventory.scan(cfg.transpiled_dir, include=cfg.include_globs, exclude=cfg.exclude_globs)
+        stage = modify_stage_key(cfg.output_dir, catalog_name, schema_name, bool(cfg.targets))
+        pending = entries if force else inventory.needing(
+            entries, stage, lambda e: published_sql_exists(cfg.output_dir, e.rel_path)
+        )
+    costs = CostModel(cfg.analyzer_report)
+    pending = longest_first(pending, lambda e: costs.cost(e.path))
+
+    plans = []
+    for entry in pending:
+        if entry.size > cfg.batch_chars:
+            chunks = iter_statement_batches(entry.path, cfg.batch_chars)
+        else:
+            with open(entry.path, "r", encoding="utf-8") as f:
+                chunks = [f.read()]
+
+        calls = prompt_tokens = completion_tokens = largest = 0
+        seconds = 0.0
+        for chunk in chunks:
+            # Placeholder names stand in for the catalog/schema picked at run time
+            prompt = _build_prompt(chunk, "<catalog>", "<schema>")
+            completion = int(count_tokens(chunk) * COMPLETION_GROWTH)
+            calls += 1
+            prompt_tokens += count_tokens(prompt)
+            completion_tokens += completion
+            largest = max(largest, completion)
+            seconds += LLM_CALL_OVERHEAD_S + min(completion, MAX_COMPLETION_TOKENS) / LLM_OUTPUT_TOKENS_PER_S
+        plans.append(FilePlan(entry.rel_path, calls, prompt_tokens, completion_tokens, largest, seconds))
+
+    print(f"Modify plan for {cfg.transpiled_dir} ({len(entries)} files, {len(plans)} need processing):")
+    print(f"  {'file':<50} {'calls':>5} {'prompt':>9} {'completion':>10}")
+    for plan in plans:
+        flag = f"  EXCEEDS max_completion_tokens ({MAX_COMPLETION_TOKENS})" if plan.over_limit else ""
+        print(f"  {plan.rel_path:<50} {plan.calls:>5} {plan.prompt_tokens:>9} {plan.completion_tokens:>10}{flag}")
+
+    total_calls = sum(p.calls for p in plans)
+    total_prompt = sum(p.prompt_tokens for p in plans)
+    total_completion = sum(p.completion_tokens for p in plans)
+    over = [p for p in plans if p.over_limit]
+    wall = _project_wall_time([p.seconds for p in plans], cfg.workers)
+    print(f"  Total: {total_calls} API calls, {total_prompt} prompt + {total_completion} completion tokens")
+    if over:
+        print(f"  {len(over)} file(s) likely to be truncated at {MAX_COMPLETION_TOKENS} completion tokens")
+    print(f"  Projected wall time with {cfg.workers} worker(s): {_format_seconds(wall)}")
+    return plans
+
+
+def plan_upload(cfg: UploadModel, force: bool = False) -> List[str]:
+    """List the workspace imports and mkdirs the upload stage would perform.
+
+    Files recorded as uploaded are checked against a listing of the workspace,
+    which is read-only; force lists every file.
+    """
+    from service.upload_service import UploadService
+
+    if not os.path.exists(cfg.source_notebook_path):
+        print(f"Source not found: {cfg.source_notebook_path}")
+        return []
+
+    with FileInventory(read_only=True) as inventory:
+        service = UploadService(cfg, inventory)
+        entries = service._iter_supported_files(cfg.source_notebook_path)
+        pending = entries if force else service.needing(entries, cfg.destination_directory)
+    costs = CostModel(cfg.analyzer_report)
+    pending = longest_first(pending, lambda e: costs.cost(e.path))
+
+    workspace_paths = [
+        service._workspace_object_path_from_rel(cfg.destination_directory, entry.rel_path) for entry in pending
+    ]
+    mkdirs = sorted({path.rsplit("/", 1)[0] for path in workspace_paths})
+
+    print(f"Upload plan for {cfg.source_notebook_path} -> {cfg.destination_directory} "
+          f"({len(entries)} files, {len(pending)} need uploading):")
+    for directory in mkdirs:
+        print(f"  mkdirs {directory}")
+    for entry, path in zip(pending, workspace_paths):
+        print(f"  import {entry.rel_path} -> {path} ({service._infer_format(entry.path)})")
+
+    runs = 0
+    if os.environ.get("DATABRICKS_CLUSTER_ID", "").strip():
+        runs = sum(1 for e in pending if os.path.splitext(e.path)[1].lower() in {".ipynb", ".py"})
+    cli_calls = len(mkdirs) + len(workspace_paths) + runs
+    wall = _project_wall_time([CLI_CALL_S] * cli_calls, cfg.workers)
+    print(f"  Total: {cli_calls} CLI calls ({len(mkdirs)} mkdirs, {len(workspace_paths)} imports, {runs} run submits)")
+    print(f"  Projected wall time with {cfg.workers} worker(s): {_format_seconds(wall)}")
+    return workspace_paths
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import sqlite3
+import subprocess
+import threading
+import time
+from decimal import Decimal
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Type names (before any precision) hashed as fixed-point numbers
+_NUMERIC_TYPES = {
+    "TINYINT", "SMALLINT", "INT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER",
+    "UBIGINT", "BYTE", "SHORT", "LONG", "DECIMAL", "NUMERIC", "DEC", "DOUBLE", "FLOAT", "REAL",
+}
+_BOOLEAN_TYPES = {"BOOLEAN", "BOOL"}
+_BINARY_TYPES = {"BINARY", "BLOB", "BYTEA", "VARBINARY"}
+
+
+class ReconcileConnector:
+    """Read-only access to one side (source or target) of a reconciliation.
+
+    Subclasses implement _execute() plus the two pieces of the row hash the
+    engine computes itself: _text_sql() and _hash_sql(). The SQL used for
+    counts, key ranges and partition reads is plain ANSI and shared by all of
+    them. Connectors are called from several worker threads at once.
+
+    Both sides of a reconciliation must hash equal rows alike, so every
+    connector renders a value as the same text: NULL as chr(30), numbers and
+    booleans with six decimals (``-12.500000``), binary values as upper-case
+    hex and anything else as the engine's own text cast. A row's text joins
+    its values with chr(31), and its hash is the first 32 bits of the MD5 of
+    that text.
+    """
+
+    name = "base"
+
+    def _execute(self, sql: str, params: Sequence = ()) -> Tuple[List[str], Iterator[tuple]]:
+        """Run sql and return (column names, row iterator)."""
+        raise NotImplementedError
+
+    def _placeholder(self, index: int) -> str:
+        return "?"
+
+    def close(self) -> None:
+        pass
+
+    def columns(self, table: str) -> List[str]:
+        names, rows = self._execute(f"SELECT * FROM {table} WHERE 1 = 0")
+        for _ in rows:
+            pass
+        return names
+
+    def row_count(self, table: str) -> int:
+        _, rows = self._execute(f"SELECT COUNT(*) FROM {table}")
+        return int(next(iter(rows))[0])
+
+    def key_range(self, table: str, key_column: str) -> Tuple[Optional[object], Optional[object]]:
+        _, rows = self._execute(f"SELECT MIN({key_column}), MAX({key_column}) FROM {table}")
+        return tuple(next(iter(rows)))
+
+    def explain(self, statement: str) -> List[str]:
+        """Return the engine's plan for statement; planning errors raise or appear in the plan."""
+        _, rows = self._execute(f"EXPLAIN {statement}")
+        return [str(value) for row in rows for value in row if value is not None]
+
+    def iter_rows(
+        self,
+        table: str,
+        columns: Sequence[str],
+        key_column: str,
+        lower=None,
+        upper=None,
+        include_upper: bool = False,
+    ) -> Iterator[tuple]:
+        """Yield rows of table whose key is in [lower, upper) ([lower, upper] if include_upper)."""
+        where, params = self._range_filter(key_column, lower, upper, include_upper)
+        _, rows = self._execute(f"SELECT {', '.join(columns)} FROM {table}{where}", params)
+        return rows
+
+    def _range_filter(self, key_column: str, lower, upper, include_upper: bool) -> Tuple[str, list]:
+        conditions = []
+        params = []
+        if lower is not None:
+            conditions.append(f"{key_column} >= {self._placeholder(len(params))}")
+            params.append(lower)
+        if upper is not None:
+            op = "<=" if include_upper else "<"
+            conditions.append(f"{key_column} {op} {self._placeholder(len(params))}")
+            params.append(upper)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def column_types(self, table: str, columns: Sequence[str]) -> List[str]:
+        """Upper-case type names of columns; empty where the engine has no static types."""
+        return [""] * len(columns)
+
+    def _text_sql(self, column: str, type_name: str) -> str:
+        """SQL rendering column as the shared value text (see the class docstring)."""
+        raise NotImplementedError
+
+    def _hash_sql(self, text_sql: str) -> str:
+        """SQL turning a row's text into its 32-bit hash as an integer."""
+        raise NotImplementedError
+
+    def _typed_text_sql(self, column: str, type_name: str, text_type: str) -> str:
+        """_text_sql() for engines that know each column's type."""
+        base_type = type_name.split("(")[0].strip().upper()
+        if base_type in _NUMERIC_TYPES:
+            text = f"CAST(CAST({column} AS DECIMAL(38, 6)) AS {text_type})"
+        elif base_type in _BOOLEAN_TYPES:
+            text = f"CAST(CAST(CAST({column} AS INT) AS DECIMAL(38, 6)) AS {text_type})"
+        elif base_type in _BINARY_TYPES:
+            text = f"hex({column})"
+        else:
+            text = f"CAST({column} AS {text_type})"
+        return f"COALESCE({text}, chr(30))"
+
+    def row_hash_sql(self, table: str, columns: Sequence[str]) -> str:
+        """SQL for the hash of one row of table over columns, for partition_digest()."""
+        types = self.column_types(table, columns)
+        text = " || chr(31) || ".join(self._text_sql(c, t) for c, t in zip(columns, types))
+        return self._hash_sql(text)
+
+    def partition_digest(self, table: str, row_hash_sql: str, key_column: str, lower=None, upper=None,
+                         include_upper: bool = False) -> Tuple[int, int]:
+        """Return (row count, sum of row hashes) for one key range, aggregated by the engine."""
+        where, params = self._range_filter(key_column, lower, upper, include_upper)
+        _, rows = self._execute(f"SELECT COUNT(*), SUM({row_hash_sql}) FROM {table}{where}", params)
+        count, digest = next(iter(rows))
+        return int(count), int(digest or 0)
+
+
+class SQLiteConnector(ReconcileConnector):
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            # SQLite has no MD5 and no chr(); provide both as functions
+            conn.create_function("lb_hash32", 1, _md5_32, deterministic=True)
+            conn.create_function("chr", 1, chr, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, sql, params=()):
+        cursor = self._connection().execute(sql, tuple(params))
+        names = [d[0] for d in cursor.description]
+        return names, iter(cursor)
+
+    def _text_sql(self, column, type_name):
+        # Values carry their own storage class, whatever the column was declared as
+        return (
+            f"CASE typeof({column}) WHEN 'null' THEN chr(30) WHEN 'integer' THEN {column} || '.000000' "
+            f"WHEN 'real' THEN printf('%.6f', {column}) WHEN 'blob' THEN hex({column}) ELSE {column} END"
+        )
+
+    def _hash_sql(self, text_sql):
+        return f"lb_hash32({text_sql})"
+
+
+def _md5_32(text: str) -> int:
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class DuckDBConnector(ReconcileConnector):
+    name = "duckdb"
+
+    def __init__(self, path: str) -> None:
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("The duckdb connector needs the 'duckdb' package: pip install duckdb")
+        self._duckdb = duckdb
+        self.path = path
+        self._local = threading.local()
+
+    def _execute(self, sql, params=()):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._duckdb.connect(self.path, read_only=True)
+            self._local.conn = conn
+        cursor = conn.execute(sql, list(params))
+        names = [d[0] for d in cursor.description]
+        return names, iter(lambda: cursor.fetchone(), None)
+
+    def column_types(self, table, columns):
+        _, rows = self._execute(f"DESCRIBE SELECT {', '.join(columns)} FROM {table}")
+        return [str(row[1]).upper() for row in rows]
+
+    def _text_sql(self, column, type_name):
+        return self._typed_text_sql(column, type_name, "VARCHAR")
+
+    def _hash_sql(self, text_sql):
+        return f"CAST('0x' || substr(md5({text_sql}), 1, 8) AS BIGINT)"
+
+
+_DATABRICKS_INT_TYPES = {"BYTE", "SHORT", "INT", "LONG", "TINYINT", "SMALLINT", "BIGINT", "INTEGER"}
+_DATABRICKS_DECIMAL_TYPES = {"DECIMAL", "DOUBLE", "FLOAT"}
+
+
+class DatabricksSqlConnector(ReconcileConnector):
+    """Run statements on a SQL warehouse through the Databricks CLI's statement API."""
+
+    name = "databricks"
+
+    def __init__(self, warehouse_id: str, profile: str = "", catalog: str = "", schema: str = "") -> None:
+        self.warehouse_id = warehouse_id
+        self.profile = profile
+        # Default namespace for unqualified names in the statements
+        self.catalog = catalog
+        self.schema = schema
+
+    def _placeholder(self, index: int) -> str:
+        return f":p{index}"
+
+    def _cli(self, *args: str) -> dict:
+        command = ["databricks", "api", *args]
+        if self.profile:
+            command.extend(["-p", self.profile])
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        return json.loads(result.stdout)
+
+    def _run(self, sql: str, params: Sequence = ()) -> dict:
+        """Run sql to completion and return the statement API's final response."""
+        payload = {
+            "warehouse_id": self.warehouse_id,
+            "statement": sql,
+            "wait_timeout": "50s",
+            "disposition": "INLINE",
+            "format": "JSON_ARRAY",
+            "parameters": [{"name": f"p{i}", "value": str(v)} for i, v in enumerate(params)],
+        }
+        if self.catalog:
+            payload["catalog"] = self.catalog
+        if self.schema:
+            payload["schema"] = self.schema
+        response = self._cli("post", "/api/2.0/sql/statements", "--json", json.dumps(payload))
+        statement_id = response["statement_id"]
+        while response["status"]["state"] in ("PENDING", "RUNNING"):
+            time.sleep(2)
+            response = self._cli("get", f"/api/2.0/sql/statements/{statement_id}")
+        if response["status"]["state"] != "SUCCEEDED":
+            error = response["status"].get("error", {}).get("message", response["status"]["state"])
+            raise RuntimeError(f"Statement failed: {error}")
+        return response
+
+    def _execute(self, sql, params=()):
+        response = self._run(sql, params)
+        schema = response["manifest"]["schema"]["columns"]
+        names = [c["name"] for c in schema]
+        types = [c.get("type_name", "STRING") for c in schema]
+        return names, self._iter_chunks(response.get("result", {}), types)
+
+    def column_types(self, table, columns):
+        response = self._run(f"SELECT {', '.join(columns)} FROM {table} WHERE 1 = 0")
+        return [c.get("type_name", "STRING").upper() for c in response["manifest"]["schema"]["columns"]]
+
+    def _text_sql(self, column, type_name):
+        return self._typed_text_sql(column, type_name, "STRING")
+
+    def _hash_sql(self, text_sql):
+        return f"CAST(conv(substr(md5({text_sql}), 1, 8), 16, 10) AS BIGINT)"
+
+    def _iter_chunks(self, result: dict, types: List[str]) -> Iterator[tuple]:
+        while True:
+            for row in result.get("data_array", []) or []:
+                yield tuple(self._convert(v, t) for v, t in zip(row, types))
+            link = result.get("next_chunk_internal_link")
+            if not link:
+                return
+            result = self._cli("get", link)
+
+    @staticmethod
+    def _convert(value, type_name: str):
+        # JSON_ARRAY returns every value as a string; restore numbers so both sides hash alike
+        if value is None:
+            return None
+        if type_name in _DATABRICKS_INT_TYPES:
+            return int(value)
+        if type_name in _DATABRICKS_DECIMAL_TYPES:
+            return Decimal(value)
+        if type_name == "BOOLEAN":
+            return value.lower() == "true"
+        return value
+
+
+def create_connector(spec: str, profile: str = "") -> ReconcileConnector:
+    """Build a connector from a spec string.
+
+    Supported specs: ``sqlite:///relative.db`` / ``sqlite:////abs/path.db``
+    (SQLAlchemy style), the same forms for ``duckdb`` and
+    ``databricks://<warehouse_id>``.
+    """
+    scheme, sep, rest = spec.partition("://")
+    if not sep:
+        raise ValueError(f"Invalid connector spec '{spec}', expected <type>://<location>")
+    path = rest[1:] if rest.startswith("/") else rest
+    if scheme == "sqlite":
+        return SQLiteConnector(path)
+    if scheme == "duckdb":
+        return DuckDBConnector(path)
+    if scheme == "databricks":
+        return DatabricksSqlConnector(rest, profile)
+    raise ValueError(f"Unknown connector type: {scheme}")
@@ -0,0 +1,258 @@
+import datetime
+import json
+import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from models.reconcile_model import ReconcilerModel, TableMapping
+from service.reconcile_connectors import ReconcileConnector, create_connector
+
+# Partitions larger than this are split again before comparing individual rows
+_DRILLDOWN_ROWS = 10000
+
+
+@dataclass
+class TableReconcileResult:
+    source_table: str
+    target_table: str
+    source_count: int = 0
+    target_count: int = 0
+    partitions_compared: int = 0
+    mismatched_partitions: List[Tuple] = field(default_factory=list)
+    missing_in_target: List = field(default_factory=list)
+    missing_in_source: List = field(default_factory=list)
+    changed: List = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and self.source_count == self.target_count and not self.mismatched_partitions
+
+
+def _normalize(value) -> str:
+    """Render a value the same way whichever engine it came from."""
+    if value is None:
+        return "\x00"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (float, Decimal)):
+        number = Decimal(str(value))
+        if number == number.to_integral_value():
+            return str(int(number))
+        return format(number.normalize(), "f")
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def _key_ranges(lower, upper, partitions: int) -> List[Tuple]:
+    """Split [lower, upper] into (lower, upper, include_upper) ranges.
+
+    Non-numeric or missing keys give a single unbounded range.
+    """
+    if lower is None or upper is None or not (_is_number(lower) and _is_number(upper)) or partitions <= 1:
+        return [(None, None, False)]
+    if isinstance(lower, int) and isinstance(upper, int):
+        step = max(1, math.ceil((upper - lower + 1) / partitions))
+        bounds = list(range(lower, upper + 1, step))
+    else:
+        # Stay in the key's own type so drivers that cannot bind Decimal still work
+        number = float if isinstance(lower, float) and isinstance(upper, float) else lambda v: Decimal(str(v))
+        step = (number(upper) - number(lower)) / partitions
+        if step == 0:
+            return [(lower, upper, True)]
+        bounds = [number(lower) + step * i for i in range(partitions)]
+    ranges = [(bounds[i], bounds[i + 1], False) for i in range(len(bounds) - 1)]
+    ranges.append((bounds[-1], upper, True))
+    return ranges
+
+
+def _narrower_ranges(key_range: Tuple, partitions: int) -> List[Tuple]:
+    """Split a key range into smaller ones; empty once it cannot shrink.
+
+    That is the case for an unbounded range and for one that spans a single
+    key value, which a non-unique key can fill with any number of rows.
+    """
+    lower, upper, include_upper = key_range
+    if lower is None or lower == upper:
+        return []
+    narrower = _key_ranges(lower, upper, partitions)
+    if not include_upper:
+        # Sub-ranges of a half-open range must stay half-open at the top
+        narrower[-1] = (narrower[-1][0], upper, False)
+    # A half-open range with equal bounds holds nothing
+    narrower = [r for r in narrower if r[0] != r[1] or r[2]]
+    if len(narrower) <= 1 or key_range in narrower:
+        return []
+    return narrower
+
+
+class _TableReconciler:
+    def __init__(self, cfg: ReconcilerModel, source: ReconcileConnector, target: ReconcileConnector,
+                 mapping: TableMapping, pool: ThreadPoolExecutor) -> None:
+        self.cfg = cfg
+        self.source = source
+        self.target = target
+        self.mapping = mapping
+        self.pool = pool
+        self.result = TableReconcileResult(mapping.source_table, mapping.target_table)
+
+    def run(self) -> TableReconcileResult:
+        mapping = self.mapping
+        columns = list(mapping.columns or self.source.columns(mapping.source_table))
+        if mapping.key_column.lower() not in (c.lower() for c in columns):
+            columns.insert(0, mapping.key_column)
+        self.columns = columns
+        self.key_index = [c.lower() for c in columns].index(mapping.key_column.lower())
+        self.source_hash = self.source.row_hash_sql(mapping.source_table, columns)
+        self.target_hash = self.target.row_hash_sql(mapping.target_table, columns)
+
+        counts = [
+            self.pool.submit(self.source.row_count, mapping.source_table),
+            self.pool.submit(self.target.row_count, mapping.target_table),
+        ]
+        bounds = [
+            self.pool.submit(self.source.key_range, mapping.source_table, mapping.key_column),
+            self.pool.submit(self.target.key_range, mapping.target_table, mapping.key_column),
+        ]
+        self.result.source_count, self.result.target_count = (f.result() for f in counts)
+        (source_min, source_max), (target_min, target_max) = (f.result() for f in bounds)
+
+        lows = [v for v in (source_min, target_min) if v is not None]
+        highs = [v for v in (source_max, target_max) if v is not None]
+        ranges = _key_ranges(min(lows) if lows else None, max(highs) if highs else None, self.cfg.partitions)
+        self._compare_ranges(ranges)
+        return self.result
+
+    def _compare_ranges(self, ranges: List[Tuple]) -> None:
+        futures = [
+            (
+                key_range,
+                self.pool.submit(self.source.partition_digest, self.mapping.source_table, self.source_hash, self.mapping.key_column, *key_range),
+                self.pool.submit(self.target.partition_digest, self.mapping.target_table, self.target_hash, self.mapping.key_column, *key_range),
+            )
+            for key_range in ranges
+        ]
+        for key_range, source_future, target_future in futures:
+            source_count, source_digest = source_future.result()
+            target_count, target_digest = target_future.result()
+            self.result.partitions_compared += 1
+            if (source_count, source_digest) == (target_count, target_digest):
+                continue
+
+            narrower = _narrower_ranges(key_range, self.cfg.partitions)
+            if max(source_count, target_count) > _DRILLDOWN_ROWS and narrower:
+                self._compare_ranges(narrower)
+            else:
+                self.result.mismatched_partitions.append(key_range)
+                self._compare_rows(key_range)
+
+    def _compare_rows(self, key_range: Tuple) -> None:
+        limit = self.cfg.max_row_diffs
+        result = self.result
+        if len(result.missing_in_target) + len(result.missing_in_source) + len(result.changed) >= limit:
+            return
+
+        def load(connector: ReconcileConnector, table: str) -> Dict[str, List[Tuple[str, ...]]]:
+            rows: Dict[str, List[Tuple[str, ...]]] = {}
+            for row in connector.iter_rows(table, self.columns, self.mapping.key_column, *key_range):
+                normalized = tuple(_normalize(v) for v in row)
+                rows.setdefault(normalized[self.key_index], []).append(normalized)
+            return rows
+
+        source_future = self.pool.submit(load, self.source, self.mapping.source_table)
+        target_rows = load(self.target, self.mapping.target_table)
+        source_rows = source_future.result()
+
+        for key, rows in source_rows.items():
+            others = target_rows.get(key, [])
+            if len(rows) == len(others) == 1:
+                if rows[0] != others[0]:
+                    result.changed.append({
+                        "key": key,
+                        "columns": [c for c, a, b in zip(self.columns, rows[0], others[0]) if a != b],
+                    })
+                continue
+            # A key that is missing or not unique: compare its rows as multisets, one entry per unmatched row
+            source_only, target_only = Counter(rows), Counter(others)
+            source_only.subtract(others)
+            target_only.subtract(rows)
+            result.missing_in_target.extend([key] * sum(n for n in source_only.values() if n > 0))
+            result.missing_in_source.extend([key] * sum(n for n in target_only.values() if n > 0))
+        for key, others in target_rows.items():
+            if key not in source_rows:
+                result.missing_in_source.extend([key] * len(others))
+
+        del result.missing_in_target[limit:]
+        del result.missing_in_source[limit:]
+        del result.changed[limit:]
+
+
+def reconcile_table(cfg: ReconcilerModel, source: ReconcileConnector, target: ReconcileConnector,
+                    mapping: TableMapping, pool: Optional[ThreadPoolExecutor] = None) -> TableReconcileResult:
+    """Compare one source table with its migrated target.
+
+    Row counts are checked first, then both sides are split into the same key
+    ranges and each range is reduced to (count, sum of row hashes) in parallel
+    by the engines themselves. Rows are only transferred for ranges whose
+    aggregates differ.
+
+    The key need not be unique. Rows sharing a key value are compared as a
+    multiset, and rows with no identical counterpart are reported as missing
+    on their side rather than as changed.
+    """
+    own_pool = pool is None
+    pool = pool or ThreadPoolExecutor(max_workers=cfg.workers)
+    try:
+        return _TableReconciler(cfg, source, target, mapping, pool).run()
+    except Exception as e:
+        return TableReconcileResult(mapping.source_table, mapping.target_table, error=str(e))
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def run_reconciler(cfg: ReconcilerModel) -> List[TableReconcileResult]:
+    if not cfg.tables:
+        print("No tables configured; skipping reconciliation.")
+        return []
+
+    source = create_connector(cfg.source_connector, cfg.profile_name)
+    target = create_connector(cfg.target_connector, cfg.profile_name)
+    results = []
+    with ThreadPoolExecutor(max_workers=cfg.workers) as pool:
+        for mapping in cfg.tables:
+            print(f"Reconciling {mapping.source_table} -> {mapping.target_table}...")
+            result = reconcile_table(cfg, source, target, mapping, pool)
+            results.append(result)
+            if result.error:
+                print(f"  Error: {result.error}")
+            elif result.ok:
+                print(f"  OK: {result.source_count} rows in {result.partitions_compared} partitions")
+            else:
+                print(
+                    f"  MISMATCH: source {result.source_count} rows, target {result.target_count} rows, "
+                    f"{len(result.mismatched_partitions)} of {result.partitions_compared} partitions differ "
+                    f"({len(result.missing_in_target)} missing in target, {len(result.missing_in_source)} "
+                    f"missing in source, {len(result.changed)} changed)"
+                )
+    source.close()
+    target.close()
+
+    with open(cfg.report_file, "w", encoding="utf-8") as f:
+        json.dump([dict(asdict(r), ok=r.ok) for r in results], f, indent=2, default=str)
+    print(f"Reconciliation report written to {cfg.report_file}")
+    return results
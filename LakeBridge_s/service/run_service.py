@@ -1,7 +1,4 @@
 import os
-from nbconvert import NotebookExporter, HTMLExporter
-from nbconvert.preprocessors import ExecutePreprocessor
-import nbformat
 from models.run_model import RunModel
 
 
@@ -10,6 +7,10 @@ class RunService:
         self.model = model
 
     def run(self) -> str:
+        # nbconvert pulls in jinja2/traitlets; import it only when a notebook is actually executed
+        import nbformat
+        from nbconvert.preprocessors import ExecutePreprocessor
+
         notebook_path = self.model.get_notebook_path()
         if not os.path.isfile(notebook_path):
             raise FileNotFoundError(f"Notebook not found: {notebook_path}")
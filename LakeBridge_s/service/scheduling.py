@@ -0,0 +1,178 @@
+import heapq
+import os
+import re
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_XLSX_NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+# Header patterns from most to least preferred: "File Name" beats "Object Type", and a
+# complexity rating beats a line count
+_FILE_HEADERS = [re.compile(p, re.IGNORECASE) for p in (
+    r"^\s*(file|script)\s*(name|path)?\s*$|^\s*(full\s*)?path\s*$",
+    r"file|path",
+    r"script|program",
+    r"name",
+    r"object",
+)]
+_SCORE_HEADERS = [re.compile(p, re.IGNORECASE) for p in (
+    r"complexity",
+    r"score|weight",
+    r"statements",
+    r"lines|loc\b",
+)]
+_GENERATED_NAME = re.compile(r"^modified_(.+?)(?:_\d{8}_\d{6})?(\.\w+)$")
+_COMPLEXITY_WEIGHTS = {"low": 1.0, "simple": 1.0, "medium": 2.0, "complex": 4.0, "high": 4.0, "very complex": 8.0, "very high": 8.0}
+
+
+def _column_index(cell_ref: str) -> int:
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - ord("A") + 1)
+    return index - 1
+
+
+def _read_xlsx_rows(path: str) -> List[List[List[str]]]:
+    """Return the rows of every worksheet as lists of cell strings (stdlib only)."""
+    import zipfile
+    from xml.etree import ElementTree
+
+    sheets = []
+    with zipfile.ZipFile(path) as archive:
+        shared: List[str] = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            root = ElementTree.fromstring(archive.read("xl/sharedStrings.xml"))
+            shared = ["".join(t.text or "" for t in si.iter(f"{{{_XLSX_NS['m']}}}t")) for si in root.findall("m:si", _XLSX_NS)]
+        for name in sorted(n for n in archive.namelist() if n.startswith("xl/worksheets/sheet") and n.endswith(".xml")):
+            rows = []
+            root = ElementTree.fromstring(archive.read(name))
+            for row in root.iter(f"{{{_XLSX_NS['m']}}}row"):
+                values: Dict[int, str] = {}
+                for cell in row.findall("m:c", _XLSX_NS):
+                    kind = cell.get("t")
+                    if kind == "inlineStr":
+                        text = "".join(t.text or "" for t in cell.iter(f"{{{_XLSX_NS['m']}}}t"))
+                    else:
+                        v = cell.find("m:v", _XLSX_NS)
+                        text = v.text if v is not None and v.text is not None else ""
+                        if kind == "s" and text:
+                            text = shared[int(text)]
+                    values[_column_index(cell.get("r", "A"))] = text
+                if values:
+                    rows.append([values.get(i, "") for i in range(max(values) + 1)])
+            sheets.append(rows)
+    return sheets
+
+
+def _best_column(header: List[str], patterns: Sequence[re.Pattern], skip: int = -1) -> Optional[int]:
+    """Index of the leftmost column matching the most preferred pattern any column matches."""
+    for pattern in patterns:
+        for index, name in enumerate(header):
+            if index != skip and pattern.search(name):
+                return index
+    return None
+
+
+def _parse_weight(value: str) -> Optional[float]:
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return _COMPLEXITY_WEIGHTS.get(value.lower())
+
+
+def load_analyzer_weights(report_file: str) -> Dict[str, float]:
+    """Read per-file complexity weights from an analyzer .xlsx report.
+
+    The report layout varies by source technology, so every sheet is searched
+    for a header row with a file/path column and a complexity-like column
+    (a numeric score or a LOW/MEDIUM/COMPLEX label), preferring an exact file
+    name header and a complexity rating over a line count when there are
+    several candidates. Numeric scores are scaled so the median file has
+    weight 1. Keys are lower-cased base names.
+    """
+    raw: Dict[str, float] = {}
+    numeric = False
+    for rows in _read_xlsx_rows(report_file):
+        if not rows:
+            continue
+        header = rows[0]
+        score_col = _best_column(header, _SCORE_HEADERS)
+        file_col = _best_column(header, _FILE_HEADERS, skip=score_col)
+        if file_col is None or score_col is None:
+            continue
+        for row in rows[1:]:
+            if file_col >= len(row) or score_col >= len(row) or not row[file_col].strip():
+                continue
+            weight = _parse_weight(row[score_col])
+            if weight is None:
+                continue
+            numeric = numeric or row[score_col].strip().lower() not in _COMPLEXITY_WEIGHTS
+            raw[os.path.basename(row[file_col].strip().replace("\\", "/")).lower()] = weight
+        if raw:
+            break
+
+    if numeric and raw:
+        import statistics
+
+        median = statistics.median(raw.values()) or 1.0
+        raw = {name: max(weight / median, 0.1) for name, weight in raw.items()}
+    return raw
+
+
+class CostModel:
+    """Estimate the relative cost of processing a file.
+
+    The estimate is the file size, scaled by the analyzer's complexity weight
+    when the report lists the file. Without a report, size alone is used.
+    """
+
+    def __init__(self, report_file: str = "") -> None:
+        self.weights: Dict[str, float] = {}
+        if report_file and os.path.isfile(report_file):
+            # Reading a report is rare; keep zipfile/ElementTree out of every stage's import time
+            import zipfile
+            from xml.etree import ElementTree
+
+            try:
+                self.weights = load_analyzer_weights(report_file)
+            except (zipfile.BadZipFile, ElementTree.ParseError, KeyError) as e:
+                print(f"Could not read analyzer report {report_file}: {e}; using file sizes")
+        if self.weights:
+            print(f"Loaded cost estimates for {len(self.weights)} files from {report_file}")
+
+    def cost(self, path: str) -> float:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        name = os.path.basename(path).lower()
+        # Generated outputs are weighed like the source file they came from
+        generated = _GENERATED_NAME.match(name)
+        if generated:
+            name = generated.group(1) + ".sql"
+        weight = self.weights.get(name)
+        if weight is None:
+            weight = self.weights.get(os.path.splitext(name)[0], 1.0)
+        return max(size, 1) * weight
+
+
+def longest_first(items: Sequence[T], cost: Callable[[T], float]) -> List[T]:
+    """Order items heaviest first so the long jobs start while there are idle workers."""
+    return sorted(items, key=cost, reverse=True)
+
+
+def assign_shards(items: Sequence[T], cost: Callable[[T], float], shards: int) -> List[List[T]]:
+    """Split items into shards of roughly equal total cost (longest processing time first)."""
+    shards = max(1, min(shards, len(items)))
+    buckets: List[List[T]] = [[] for _ in range(shards)]
+    heap = [(0.0, i) for i in range(shards)]
+    for item in longest_first(items, cost):
+        load, index = heapq.heappop(heap)
+        buckets[index].append(item)
+        heapq.heappush(heap, (load + cost(item), index))
+    return [bucket for bucket in buckets if bucket]
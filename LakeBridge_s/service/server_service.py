@@ -0,0 +1,307 @@
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from models.job_model import TranslationJob
+from models.modify_model import ModifyNotebookModel, NamespaceTarget
+from service.helper import list_catalogs, list_schemas
+from service.inventory_service import FileInventory
+from service.llm_backend import backend_usage
+from service.modify_service import run_modify_and_create_notebooks
+from service.namespace_service import default_target_dir
+from service.scheduling import CostModel
+
+DEFAULT_PORT = 8765
+
+
+class MetadataCache:
+    """Catalog and schema listings from the Databricks CLI, refreshed after ttl seconds.
+
+    Each listing costs a CLI process and a workspace round-trip, so jobs
+    validate their namespace against these cached lists instead.
+    """
+
+    def __init__(self, ttl: float = 600.0) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._catalogs = None
+        self._schemas: Dict[str, tuple] = {}
+
+    def _fresh(self, entry) -> bool:
+        return entry is not None and time.monotonic() - entry[0] < self.ttl
+
+    def catalogs(self) -> List[str]:
+        with self._lock:
+            if not self._fresh(self._catalogs):
+                self._catalogs = (time.monotonic(), list_catalogs())
+            return self._catalogs[1]
+
+    def schemas(self, catalog: str) -> List[str]:
+        with self._lock:
+            entry = self._schemas.get(catalog)
+            if not self._fresh(entry):
+                entry = self._schemas[catalog] = (time.monotonic(), list_schemas(catalog))
+            return entry[1]
+
+    def validate(self, catalog: str, schema: str) -> None:
+        if catalog not in self.catalogs():
+            raise ValueError(f"Catalog '{catalog}' not found")
+        if schema not in self.schemas(catalog):
+            raise ValueError(f"Schema '{schema}' not found in catalog '{catalog}'")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._catalogs = None
+            self._schemas.clear()
+
+
+def _build_job(payload: dict, analyzer_report: str = "") -> TranslationJob:
+    """Turn a POST /jobs body into a queued job. Raises ValueError on bad input."""
+    if not isinstance(payload, dict) or not payload.get("input_path"):
+        raise ValueError("'input_path' is required")
+    input_path = payload["input_path"]
+    targets = [
+        NamespaceTarget(t["catalog"], t["schema"], t.get("output_dir") or default_target_dir(
+            payload.get("output_dir") or input_path, t["catalog"], t["schema"]))
+        for t in payload.get("targets", [])
+    ]
+    catalog, schema = payload.get("catalog", ""), payload.get("schema", "")
+    if not targets and not (catalog and schema):
+        raise ValueError("Either 'catalog' and 'schema' or a list of 'targets' is required")
+    # Templates are namespace-neutral; concrete scripts default to a directory of their own namespace
+    output_dir = payload.get("output_dir") or (input_path if targets else default_target_dir(input_path, catalog, schema))
+
+    cfg = ModifyNotebookModel(
+        transpiled_dir=input_path,
+        output_dir=output_dir,
+        llm_model=payload.get("llm_model", "llama-3.1-8b-instant"),
+        temperature=float(payload.get("temperature", 0.6)),
+        stream=bool(payload.get("stream", False)),
+        backend=payload.get("backend", "groq"),
+        local_base_url=payload.get("local_base_url", "http://localhost:11434/v1"),
+        batch_chars=int(payload.get("batch_chars", 12000)),
+        notebook_max_bytes=int(payload.get("notebook_max_bytes", 64 << 20)),
+        workers=int(payload.get("workers", 1)),
+        analyzer_report=payload.get("analyzer_report", analyzer_report),
+        targets=targets,
+    )
+    return TranslationJob(id=uuid.uuid4().hex[:12], config=cfg, catalog=catalog, schema=schema)
+
+
+def _output_dirs(job: TranslationJob) -> set:
+    """Every directory a job writes into: its output_dir and each target's."""
+    cfg = job.config
+    return {os.path.abspath(path) for path in [cfg.output_dir] + [t.output_dir for t in cfg.targets]}
+
+
+class JobService:
+    """Queue of modify jobs run by a fixed pool of worker threads.
+
+    State that is expensive to rebuild lives as long as the service does: the
+    LLM backends (pooled per process), the file inventory, the catalog/schema
+    listings and the parsed analyzer reports.
+    """
+
+    def __init__(
+        self, workers: int = 2, analyzer_report: str = "", history: int = 1000, inventory: FileInventory = None,
+    ) -> None:
+        self.analyzer_report = analyzer_report
+        self.history = history
+        self.inventory = inventory or FileInventory()
+        self.metadata = MetadataCache()
+        self._costs: Dict[str, CostModel] = {}
+        self._jobs: "OrderedDict[str, TranslationJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[TranslationJob]]" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, payload: dict) -> TranslationJob:
+        job = _build_job(payload, self.analyzer_report)
+        with self._lock:
+            self._check_output_dir(job)
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[TranslationJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[TranslationJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def status(self) -> dict:
+        counts: Dict[str, int] = {}
+        for job in self.jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": len(self._threads), "jobs": counts, "llm_usage": backend_usage()}
+
+    def close(self) -> None:
+        """Stop the workers once the jobs already queued have run."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.inventory.close()
+
+    def _check_output_dir(self, job: TranslationJob) -> None:
+        """Refuse a job that writes where another job is writing, or over another namespace's outputs.
+
+        Two jobs on one directory would race on its views, artifact store and
+        lineage index even for the same namespace, so that waits for the first
+        job to finish.
+        """
+        output_dir = os.path.abspath(job.config.output_dir)
+        output_dirs = _output_dirs(job)
+        for other in self._jobs.values():
+            if other.status == "failed":
+                continue
+            shared = output_dirs & _output_dirs(other)
+            if shared and other.status in ("queued", "running"):
+                raise ValueError(
+                    f"Job {other.id} is {other.status} on {', '.join(sorted(shared))}; "
+                    f"resubmit when it has finished or give this job its own 'output_dir'"
+                )
+            if os.path.abspath(other.config.output_dir) == output_dir and other.namespace() != job.namespace():
+                raise ValueError(
+                    f"Output directory {job.config.output_dir} holds {other.namespace()} outputs of job "
+                    f"{other.id}; give this job its own 'output_dir'"
+                )
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("done", "failed")]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _cost_model(self, report_file: str) -> CostModel:
+        with self._lock:
+            costs = self._costs.get(report_file)
+            if costs is None:
+                costs = self._costs[report_file] = CostModel(report_file)
+            return costs
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: TranslationJob) -> None:
+        cfg = job.config
+        job.started_at = time.time()
+        job.status = "running"
+        job.timings["queued"] = round(job.started_at - job.submitted_at, 3)
+        print(f"Job {job.id}: modifying {cfg.transpiled_dir} -> {cfg.output_dir}")
+        try:
+            started = time.perf_counter()
+            namespaces = [(t.catalog, t.schema) for t in cfg.targets] or [(job.catalog, job.schema)]
+            for catalog, schema in namespaces:
+                self.metadata.validate(catalog, schema)
+            job.timings["validate"] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            run_modify_and_create_notebooks(
+                cfg, job.catalog, job.schema,
+                inventory=self.inventory,
+                costs=self._cost_model(cfg.analyzer_report),
+                results=job.files,
+            )
+            job.timings["modify"] = round(time.perf_counter() - started, 3)
+            failed = sorted(path for path, result in job.files.items() if result.get("status") == "failed")
+            if failed:
+                job.error = f"{len(failed)} of {len(job.files)} files failed: {', '.join(failed)}"
+            job.status = "failed" if failed else "done"
+        except (ValueError, OSError, subprocess.CalledProcessError) as e:
+            job.error = getattr(e, "stderr", None) or str(e)
+            job.status = "failed"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            job.timings["total"] = round(job.finished_at - job.started_at, 3)
+            print(f"Job {job.id}: {job.status} in {job.timings['total']:.1f}s")
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    server_version = "LakeBridgeJobs/1.0"
+
+    @property
+    def jobs(self) -> JobService:
+        return self.server.job_service
+
+    def _send(self, status: int, body) -> None:
+        data = json.dumps(body, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self._send(200, self.jobs.status())
+        elif path == "/jobs":
+            self._send(200, [job.to_dict(include_files=False) for job in self.jobs.jobs()])
+        elif path.startswith("/jobs/"):
+            job = self.jobs.get(path[len("/jobs/"):])
+            if job is None:
+                self._send(404, {"error": "Job not found"})
+            else:
+                self._send(200, job.to_dict())
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/jobs":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            job = self.jobs.submit(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(202, job.to_dict())
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = 2, analyzer_report: str = "") -> None:
+    """Run the job service until interrupted.
+
+    POST /jobs      {"input_path", "output_dir"?, "catalog", "schema" | "targets": [...], ...}
+                    output_dir defaults to <input_path>_<catalog>.<schema>, or input_path for targets
+    GET  /jobs      all jobs without per-file results
+    GET  /jobs/<id> one job with per-file status and timings
+    GET  /health    worker count, jobs per status and LLM usage
+    """
+    job_service = JobService(workers=workers, analyzer_report=analyzer_report)
+    httpd = ThreadingHTTPServer((host, port), _JobRequestHandler)
+    httpd.job_service = job_service
+    print(f"Job service listening on http://{host}:{httpd.server_address[1]} with {workers} worker(s)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down; waiting for queued jobs to finish...")
+    finally:
+        httpd.server_close()
+        job_service.close()
@@ -0,0 +1,173 @@
+import mmap
+import os
+import re
+from typing import Iterator, Tuple
+
+# Only these characters change splitter state outside comments, so the scan
+# jumps between them instead of visiting every character; inside a comment it
+# jumps straight to the comment's end. They are all ASCII, and ASCII bytes never
+# occur inside a multi-byte UTF-8 sequence, so the same scan is safe on raw bytes.
+_STR_SPECIAL = re.compile(r"[;'\\\-/]")
+_BYTES_SPECIAL = re.compile(rb"[;'\\\-/]")
+_STR_CHARS = {"backslash": "\\", "quote": "'", "semicolon": ";", "dash": "-", "slash": "/", "star": "*",
+              "newline": "\n", "block_end": "*/"}
+_BYTES_CHARS = {name: char.encode() for name, char in _STR_CHARS.items()}
+
+
+class StatementScanner:
+    """Find statement-ending semicolons, skipping those inside literals and comments.
+
+    Follows the same rules as the modify stage's splitter: a backslash escapes
+    the next character, a single quote toggles literal mode, and ``--`` line
+    comments and ``/* */`` block comments are skipped (so neither a semicolon
+    nor an apostrophe in a comment counts). State carries across calls so a
+    buffer can be scanned in pieces, even when a comment marker is split
+    between two of them.
+    """
+
+    def __init__(self) -> None:
+        self.in_single_quote = False
+        self.escape_next = False
+        self.in_line_comment = False
+        self.in_block_comment = False
+        # "-", "/" or "*" ending the previous piece, which the next piece may complete into a marker
+        self._carry = None
+
+    def scan(self, buf, pos: int = 0) -> Iterator[int]:
+        """Yield the offset just past each statement-ending semicolon in buf[pos:]."""
+        size = len(buf)
+        if pos >= size:
+            return
+        c = _STR_CHARS if isinstance(buf, str) else _BYTES_CHARS
+        pattern = _STR_SPECIAL if isinstance(buf, str) else _BYTES_SPECIAL
+        if self.escape_next:
+            self.escape_next = False
+            pos += 1
+        elif self._carry is not None:
+            carry, self._carry = self._carry, None
+            if self._close_or_open(carry, buf[pos:pos + 1], c):
+                pos += 1
+
+        while pos < size:
+            if self.in_line_comment:
+                end = buf.find(c["newline"], pos)
+                if end < 0:
+                    return
+                self.in_line_comment = False
+                pos = end + 1
+                continue
+            if self.in_block_comment:
+                end = buf.find(c["block_end"], pos)
+                if end < 0:
+                    if buf[size - 1:size] == c["star"]:
+                        self._carry = c["star"]
+                    return
+                self.in_block_comment = False
+                pos = end + 2
+                continue
+
+            pos = yield from self._scan_code(buf, pos, pattern, c)
+
+    def _scan_code(self, buf, pos: int, pattern, c):
+        """Yield statement ends from buf[pos:] up to the next comment; return where its body starts (or len(buf))."""
+        size = len(buf)
+        backslash, quote, semicolon = c["backslash"], c["quote"], c["semicolon"]
+        skip_to = pos
+        for match in pattern.finditer(buf, pos):
+            i = match.start()
+            if i < skip_to:
+                continue
+            char = match.group()
+            if char == semicolon:
+                if not self.in_single_quote:
+                    yield i + 1
+            elif char == quote:
+                self.in_single_quote = not self.in_single_quote
+            elif char == backslash:
+                if i + 1 >= size:
+                    self.escape_next = True
+                skip_to = i + 2
+            elif self.in_single_quote:
+                continue
+            elif i + 1 >= size:
+                self._carry = char
+            elif self._close_or_open(char, buf[i + 1:i + 2], c):
+                return i + 2
+        return size
+
+    def _close_or_open(self, first, second, c) -> bool:
+        """Enter or leave a comment if first + second form a marker; True if they did."""
+        if self.in_block_comment:
+            if first == c["star"] and second == c["slash"]:
+                self.in_block_comment = False
+                return True
+        elif first == c["dash"] and second == c["dash"]:
+            self.in_line_comment = True
+            return True
+        elif first == c["slash"] and second == c["star"]:
+            self.in_block_comment = True
+            return True
+        return False
+
+
+def iter_statement_spans(buf) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets of each statement in buf.
+
+    Works on str, bytes or any buffer the re module accepts (mmap included),
+    without copying the buffer. Leading/trailing whitespace is trimmed from
+    each span and empty statements are skipped. The final span may lack a
+    terminating semicolon.
+    """
+    scanner = StatementScanner()
+    start = 0
+    for end in scanner.scan(buf):
+        span = _trim_span(buf, start, end)
+        if span is not None:
+            yield span
+        start = end
+    span = _trim_span(buf, start, len(buf))
+    if span is not None:
+        yield span
+
+
+def _trim_span(buf, start: int, end: int):
+    whitespace = " \t\r\n\f\v" if isinstance(buf, str) else b" \t\r\n\f\v"
+    while start < end and buf[start:start + 1] in whitespace:
+        start += 1
+    while end > start and buf[end - 1:end] in whitespace:
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def iter_sql_file_statements(path: str) -> Iterator[str]:
+    """Yield the statements of a UTF-8 SQL file one at a time.
+
+    The file is memory-mapped and only the statement being yielded is decoded,
+    so peak memory is bounded by the largest statement rather than the file.
+    A trailing statement without a semicolon gets one appended, matching
+    _split_sql_statements.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start, end in iter_statement_spans(mm):
+            stmt = mm[start:end].decode("utf-8")
+            yield stmt if stmt.endswith(";") else f"{stmt};"
+
+
+def iter_statement_batches(path: str, batch_chars: int) -> Iterator[str]:
+    """Group the statements of a file into chunks of roughly batch_chars characters.
+
+    A statement longer than batch_chars is yielded on its own.
+    """
+    batch = []
+    size = 0
+    for stmt in iter_sql_file_statements(path):
+        if batch and size + len(stmt) > batch_chars:
+            yield "\n\n".join(batch)
+            batch = []
+            size = 0
+        batch.append(stmt)
+        size += len(stmt) + 2
+    if batch:
+        yield "\n\n".join(batch)
@@ -1,27 +1,140 @@
+import os
+import shutil
 import subprocess
+import tempfile
+from typing import List
 from models.transpile_model import TranspilerModel
+from service.inventory_service import FileInventory
+from service.scheduling import CostModel, assign_shards
 
 
-def run_transpiler(transpiler: TranspilerModel, profile: str = "DEFAULT") -> None:
-    """
-    Run Databricks Lakebridge transpiler with correct flags.
-    """
-
-    command = [
+def _build_command(transpiler: TranspilerModel, input_source: str, error_file_path: str) -> List[str]:
+    return [
         "databricks", "labs", "lakebridge", "transpile",
-        "--input-source", transpiler.input_source,
+        "--input-source", input_source,
         "--output-folder", transpiler.output_folder,
-        "--error-file-path", transpiler.error_file_path,
+        "--error-file-path", error_file_path,
         "--catalog-name", transpiler.catalog_name,
         "--schema-name", transpiler.schema_name,
-        "--skip-validation", transpiler.validate,
+        # Validation runs afterwards through the statement cache (validation_service)
+        "--skip-validation", "true",
     ]
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def transpile_stage_key(transpiler: TranspilerModel) -> str:
+    """Inventory stage under which a file counts as transpiled into this output folder and namespace."""
+    return (f"transpile:{os.path.abspath(transpiler.output_folder)}:"
+            f"{transpiler.source_dialect}:{transpiler.catalog_name}.{transpiler.schema_name}")
+
+
+def _run_sharded(transpiler: TranspilerModel, inventory: FileInventory = None) -> bool:
+    """Split the changed input files into cost-balanced shards and transpile them in parallel.
+
+    Files come from the shared inventory, so the include/exclude globs apply
+    and files transpiled unchanged before (whose output is still there) are
+    skipped. Each shard mirrors the relative paths of its files, so every
+    process writes into the same output folder layout a single run would
+    produce. Per-shard error files are merged into error_file_path afterwards.
+    """
+    own_inventory = inventory is None
+    inventory = inventory or FileInventory()
+    try:
+        return _transpile_shards(transpiler, inventory)
+    finally:
+        if own_inventory:
+            inventory.close()
+
+
+def _transpile_shards(transpiler: TranspilerModel, inventory: FileInventory) -> bool:
+    entries = inventory.scan(transpiler.input_source, include=transpiler.include_globs, exclude=transpiler.exclude_globs)
+    stage = transpile_stage_key(transpiler)
+    pending = inventory.needing(
+        entries, stage,
+        lambda e: os.path.exists(os.path.join(transpiler.output_folder, *e.rel_path.split("/"))),
+    )
+    print(f"Found {len(entries)} files, {len(pending)} changed since the last transpile")
+    if not pending:
+        print(f"Transpiler output in {transpiler.output_folder} is up to date")
+        return True
+    costs = CostModel(transpiler.analyzer_report)
+    shards = assign_shards(pending, lambda e: costs.cost(e.path), transpiler.workers)
+
+    shard_root = tempfile.mkdtemp(prefix="lakebridge_shards_")
+    base, ext = os.path.splitext(transpiler.error_file_path)
+    processes = []
+    try:
+        for index, shard in enumerate(shards):
+            shard_dir = os.path.join(shard_root, f"shard{index}")
+            for entry in shard:
+                _link_or_copy(entry.path, os.path.join(shard_dir, *entry.rel_path.split("/")))
+            error_file = f"{base}.shard{index}{ext}"
+            command = _build_command(transpiler, shard_dir, error_file)
+            print(f"Starting transpiler shard {index} ({len(shard)} files)")
+            processes.append((index, error_file, subprocess.Popen(command)))
+
+        failed = [index for index, _, process in processes if process.wait() != 0]
+        for index, shard in enumerate(shards):
+            for entry in shard:
+                inventory.mark(entry, stage, "failed" if index in failed else "done")
+
+        with open(transpiler.error_file_path, "w", encoding="utf-8") as merged:
+            for _, error_file, _ in processes:
+                if os.path.exists(error_file):
+                    with open(error_file, "r", encoding="utf-8") as part:
+                        shutil.copyfileobj(part, merged)
+                    os.remove(error_file)
+    finally:
+        shutil.rmtree(shard_root, ignore_errors=True)
+
+    if failed:
+        print(f"Transpiler failed for shard(s): {', '.join(map(str, failed))}")
+        return False
+    print(f"Transpiler completed. Output generated at {transpiler.output_folder}")
+    return True
+
+
+def _validate(transpiler: TranspilerModel, profile: str) -> None:
+    if transpiler.validate != "true":
+        return
+    # Only pulled in when validation is on; it talks to the warehouse
+    from service.validation_service import validate_transpiled_output
+
+    validate_transpiled_output(transpiler, profile)
+
+
+def run_transpiler(transpiler: TranspilerModel, profile: str = "DEFAULT") -> None:
+    """
+    Run Databricks Lakebridge transpiler with correct flags.
+    """
+    if transpiler.validate == "true" and not transpiler.warehouse:
+        # Fail before transpiling rather than after, when validation would need it
+        print("Validation is enabled but no warehouse ID was given; set one or turn validation off.")
+        return
+
+    if transpiler.workers > 1 and os.path.isdir(transpiler.input_source):
+        try:
+            if _run_sharded(transpiler):
+                _validate(transpiler, profile)
+        except FileNotFoundError:
+            print("Databricks CLI not found. Please install and configure it first.")
+        return
+
+    command = _build_command(transpiler, transpiler.input_source, transpiler.error_file_path)
     print("Running Transpiler with command:")
     print(" ".join(command))
 
     try:
         subprocess.run(command, check=True)
         print(f"Transpiler completed. Output generated at {transpiler.output_folder}")
+        _validate(transpiler, profile)
     except subprocess.CalledProcessError as e:
         print(f"Transpiler failed: {e}")
     except FileNotFoundError:
@@ -1,14 +1,23 @@
+import json
 import os
-import shutil
 import subprocess
 import tempfile
-from typing import List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set
 from models.upload_model import UploadModel
+from service.inventory_service import FileInventory, InventoryEntry
+from service.namespace_service import contains_placeholders
+from service.scheduling import CostModel, longest_first
 
 
 class UploadService:
-    def __init__(self, model: UploadModel) -> None:
+    def __init__(self, model: UploadModel, inventory: FileInventory = None) -> None:
         self.model = model
+        self.inventory = inventory or FileInventory()
+        self._created_dirs = set()
+        self._dirs_lock = threading.Lock()
+        self._listings = {}
 
     def _infer_language(self, file_path: str) -> str:
         ext = os.path.splitext(file_path)[1].lower()
@@ -34,6 +43,9 @@ class UploadService:
     def _ensure_workspace_dir(self, workspace_object_path: str) -> None:
         # Ensure parent directory exists in workspace
         parent = workspace_object_path.rsplit("/", 1)[0]
+        with self._dirs_lock:
+            if parent in self._created_dirs:
+                return
         if parent:
             subprocess.run([
                 "databricks",
@@ -41,6 +53,33 @@ class UploadService:
                 "mkdirs",
                 parent,
             ], check=True)
+            with self._dirs_lock:
+                self._created_dirs.add(parent)
+
+    def _list_workspace_dir(self, directory: str) -> Optional[Set[str]]:
+        """Object paths directly under a workspace directory, listed once per run.
+
+        A directory that does not exist is empty; None means the CLI could not
+        be run, so nothing can be said about what is there.
+        """
+        if directory not in self._listings:
+            try:
+                result = subprocess.run(
+                    ["databricks", "workspace", "list", directory, "--output", "json"],
+                    capture_output=True, text=True,
+                )
+            except OSError:
+                self._listings[directory] = None
+            else:
+                objects = json.loads(result.stdout or "[]") if result.returncode == 0 else []
+                if isinstance(objects, dict):
+                    objects = objects.get("objects", [])
+                self._listings[directory] = {obj.get("path", "").rstrip("/") for obj in objects}
+        return self._listings[directory]
+
+    def _workspace_object_exists(self, workspace_path: str) -> bool:
+        listing = self._list_workspace_dir(workspace_path.rsplit("/", 1)[0])
+        return listing is None or workspace_path in listing
 
     def _import_to_workspace(self, local_file: str, workspace_path: str) -> None:
         language = self._infer_language(local_file)
@@ -102,24 +141,31 @@ class UploadService:
             except OSError:
                 pass
 
-    def _iter_supported_files(self, source_root: str) -> List[Tuple[str, str]]:
-        supported_exts = {".ipynb", ".py", ".sql"}
-        collected: List[Tuple[str, str]] = []
-        if os.path.isdir(source_root):
-            for dirpath, _, filenames in os.walk(source_root):
-                for name in filenames:
-                    ext = os.path.splitext(name)[1].lower()
-                    if ext in supported_exts:
-                        local_file = os.path.join(dirpath, name)
-                        rel_path = os.path.relpath(local_file, source_root)
-                        collected.append((local_file, rel_path))
-        else:
-            ext = os.path.splitext(source_root)[1].lower()
-            if ext in supported_exts:
-                collected.append((source_root, os.path.basename(source_root)))
-        return collected
-
-    def upload(self) -> List[str]:
+    def _iter_supported_files(self, source_root: str) -> List[InventoryEntry]:
+        entries = self.inventory.scan(
+            source_root, include=self.model.include_globs, exclude=self.model.exclude_globs
+        )
+        # Multi-target modify runs leave catalog/schema placeholders in output_dir; only rendered targets deploy
+        templates = [
+            e for e in entries
+            if e.rel_path.rsplit("/", 1)[-1].startswith("modified_") and contains_placeholders(e.path)
+        ]
+        if templates:
+            print(f"Skipping {len(templates)} namespace templates; upload a rendered target directory instead")
+        return [e for e in entries if e not in templates]
+
+    def needing(self, entries: List[InventoryEntry], workspace_dir: str) -> List[InventoryEntry]:
+        """Entries not uploaded to workspace_dir in their current version, or deleted there since."""
+        return self.inventory.needing(
+            entries, f"upload:{workspace_dir}",
+            lambda e: self._workspace_object_exists(self._workspace_object_path_from_rel(workspace_dir, e.rel_path)),
+        )
+
+    def upload(self, force: bool = False) -> List[str]:
+        """Import new and changed files, and any whose workspace object was deleted.
+
+        force imports every file again.
+        """
         source_path = self.model.source_notebook_path
         workspace_dir = self.model.destination_directory  # Interpret as Databricks workspace directory
 
@@ -133,18 +179,34 @@ class UploadService:
         # Determine traversal root
         traversal_root = source_path if os.path.isdir(source_path) else os.path.dirname(source_path) or "."
 
-        local_with_rel = self._iter_supported_files(source_path)
-        if not local_with_rel:
+        entries = self._iter_supported_files(source_path)
+        if not entries:
             raise ValueError("No supported files found to upload (.ipynb, .py, .sql)")
 
-        imported_paths: List[str] = []
-        for file, rel in local_with_rel:
-            workspace_path = self._workspace_object_path_from_rel(workspace_dir, rel)
-            self._import_to_workspace(file, workspace_path)
-            imported_paths.append(workspace_path)
+        # Track uploads per destination so a new workspace dir still gets every file
+        stage = f"upload:{workspace_dir}"
+        # Largest files first so the slowest imports don't trail at the end
+        costs = CostModel(self.model.analyzer_report)
+        pending = entries if force else self.needing(entries, workspace_dir)
+        pending = longest_first(pending, lambda e: costs.cost(e.path))
+        print(f"Found {len(entries)} files, {len(pending)} changed since the last upload to {workspace_dir}")
+
+        def upload_entry(entry: InventoryEntry) -> str:
+            workspace_path = self._workspace_object_path_from_rel(workspace_dir, entry.rel_path)
+            try:
+                self._import_to_workspace(entry.path, workspace_path)
+            except Exception:
+                self.inventory.mark(entry, stage, "failed")
+                raise
+            self.inventory.mark(entry, stage, "done")
             # Attempt to run notebooks (.ipynb/.py) if cluster configured
-            if os.path.splitext(file)[1].lower() in {".ipynb", ".py"}:
+            if os.path.splitext(entry.path)[1].lower() in {".ipynb", ".py"}:
                 self._run_notebook_if_configured(workspace_path)
+            return workspace_path
+
+        with ThreadPoolExecutor(max_workers=max(1, self.model.workers)) as pool:
+            futures = [pool.submit(upload_entry, entry) for entry in pending]
+            imported_paths: List[str] = [future.result() for future in futures]
 
         return imported_paths
 
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Tuple
+
+from models.transpile_model import TranspilerModel
+from service.inventory_service import FileInventory
+from service.reconcile_connectors import DatabricksSqlConnector, ReconcileConnector
+from service.sql_stream import iter_sql_file_statements
+
+DEFAULT_VALIDATION_CACHE_PATH = os.environ.get(
+    "LAKEBRIDGE_VALIDATION_CACHE", os.path.join(".lakebridge", "validation_cache.db")
+)
+# Statements explained on the warehouse at the same time
+VALIDATION_CONCURRENCY = 8
+# Seconds a failure is trusted. A missing table/schema/function is often created by a
+# later script or a deploy in progress, so those failures are re-checked much sooner.
+FAILURE_TTL = 24 * 3600
+MISSING_OBJECT_TTL = 600
+
+_TOKEN_RE = re.compile(
+    r"(?P<literal>'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)"
+    r"|(?P<space>\s+|--[^\n]*|/\*.*?\*/)"
+    r"|(?P<code>[^'\"`\s\-/]+|.)",
+    re.DOTALL,
+)
+# Lines of an EXPLAIN result that mean the statement did not analyze
+_PLAN_ERROR_RE = re.compile(r"Exception|^Error occurred")
+_MISSING_OBJECT_RE = re.compile(
+    r"(TABLE_OR_VIEW|SCHEMA|CATALOG|ROUTINE)_NOT_FOUND|UNRESOLVED_ROUTINE|not found|does not exist",
+    re.IGNORECASE,
+)
+
+
+def normalize_statement(statement: str) -> str:
+    """Canonical form of a statement for cache keys.
+
+    Comments and whitespace runs collapse to one space and code is lower-cased;
+    quoted literals and identifiers are kept verbatim.
+    """
+    parts = []
+    for match in _TOKEN_RE.finditer(statement):
+        kind = match.lastgroup
+        if kind == "space":
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+        elif kind == "literal":
+            parts.append(match.group())
+        else:
+            parts.append(match.group().lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def statement_hash(statement: str) -> str:
+    return hashlib.sha256(normalize_statement(statement).encode("utf-8")).hexdigest()
+
+
+class ValidationCache:
+    """Validation outcomes keyed by (statement hash, catalog, schema, warehouse).
+
+    Only definitive outcomes are stored: the warehouse accepted the statement
+    or rejected it. Statements that could not be checked (CLI or network
+    errors) are left out so the next run retries them. Rejections expire
+    after failure_ttl seconds, or missing_ttl when the error is about a
+    missing object, and are then validated again.
+    """
+
+    _CHUNK = 500  # Stay under SQLite's bound-parameter limit
+
+    def __init__(self, db_path: str = DEFAULT_VALIDATION_CACHE_PATH, failure_ttl: float = FAILURE_TTL,
+                 missing_ttl: float = MISSING_OBJECT_TTL) -> None:
+        self.db_path = db_path
+        self.failure_ttl = failure_ttl
+        self.missing_ttl = missing_ttl
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS validations (
+                stmt_hash TEXT NOT NULL,
+                catalog TEXT NOT NULL,
+                schema_name TEXT NOT NULL,
+                warehouse TEXT NOT NULL,
+                ok INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (stmt_hash, catalog, schema_name, warehouse)
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ValidationCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _expired(self, ok: bool, message: str, checked_at: float, now: float) -> bool:
+        if ok:
+            return False
+        ttl = self.missing_ttl if _MISSING_OBJECT_RE.search(message) else self.failure_ttl
+        return now - checked_at > ttl
+
+    def lookup(self, hashes: Iterable[str], catalog: str, schema: str, warehouse: str) -> Dict[str, Tuple[bool, str]]:
+        """Return {stmt_hash: (ok, message)} for the hashes validated in this namespace and not expired."""
+        hashes = list(hashes)
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(hashes), self._CHUNK):
+                chunk = hashes[i:i + self._CHUNK]
+                rows = self._conn.execute(
+                    "SELECT stmt_hash, ok, message, checked_at FROM validations "
+                    "WHERE catalog = ? AND schema_name = ? AND warehouse = ? "
+                    f"AND stmt_hash IN ({', '.join('?' * len(chunk))})",
+                    (catalog, schema, warehouse, *chunk),
+                )
+                found.update(
+                    (h, (bool(ok), message)) for h, ok, message, checked_at in rows
+                    if not self._expired(bool(ok), message, checked_at, now)
+                )
+        return found
+
+    def store(self, stmt_hash: str, catalog: str, schema: str, warehouse: str, ok: bool, message: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validations VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (stmt_hash, catalog, schema, warehouse, int(ok), message, time.time()),
+            )
+
+    def clear(self, failures_only: bool = False) -> int:
+        """Forget cached outcomes (only rejections with failures_only); returns how many."""
+        with self._lock, self._conn:
+            where = " WHERE ok = 0" if failures_only else ""
+            return self._conn.execute(f"DELETE FROM validations{where}").rowcount
+
+
+def _validate_statement(connector: ReconcileConnector, statement: str) -> Tuple[bool, str]:
+    """EXPLAIN one statement. Raises if the warehouse could not be asked at all."""
+    try:
+        plan = "\n".join(connector.explain(statement))
+    except RuntimeError as e:
+        # The statement API ran the EXPLAIN and reported it as failed
+        return False, str(e)
+    lines = plan.splitlines()
+    for index, line in enumerate(lines):
+        if _PLAN_ERROR_RE.search(line):
+            # The error header is often followed by the exception on its own line
+            return False, " ".join(l.strip() for l in lines[index:index + 2] if l.strip())
+    return True, ""
+
+
+def validate_statements(
+    files: Dict[str, str],
+    catalog: str,
+    schema: str,
+    warehouse: str,
+    connector: ReconcileConnector,
+    cache: ValidationCache,
+    workers: int = VALIDATION_CONCURRENCY,
+) -> Dict[str, List[Tuple[int, str, bool]]]:
+    """Validate every statement of files ({rel_path: path}) through the cache.
+
+    Identical statements (after normalization) are explained once, across
+    files and across runs. Returns {rel_path: [(stmt_no, message, cached)]}
+    for the statements that failed or could not be checked.
+    """
+    occurrences: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    texts: Dict[str, str] = {}
+    for rel_path, path in files.items():
+        for stmt_no, statement in enumerate(iter_sql_file_statements(path), start=1):
+            key = statement_hash(statement)
+            occurrences[key].append((rel_path, stmt_no))
+            texts.setdefault(key, statement)
+
+    outcomes = {key: (ok, message, True) for key, (ok, message) in cache.lookup(texts, catalog, schema, warehouse).items()}
+    todo = [key for key in texts if key not in outcomes]
+    total = sum(len(o) for o in occurrences.values())
+    print(
+        f"Validating {total} statements in {len(files)} files ({len(texts)} distinct): "
+        f"{len(outcomes)} cached, {len(todo)} sent to warehouse {warehouse}"
+    )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_validate_statement, connector, texts[key]): key for key in todo}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                ok, message = future.result()
+            except (subprocess.CalledProcessError, OSError, ValueError, KeyError) as e:
+                detail = getattr(e, "stderr", None) or str(e)
+                outcomes[key] = (False, f"Could not validate: {detail.strip()}", False)
+                continue
+            cache.store(key, catalog, schema, warehouse, ok, message)
+            outcomes[key] = (ok, message, False)
+
+    failures: Dict[str, List[Tuple[int, str, bool]]] = defaultdict(list)
+    for key, (ok, message, cached) in outcomes.items():
+        if not ok:
+            for rel_path, stmt_no in occurrences[key]:
+                failures[rel_path].append((stmt_no, message, cached))
+    return {rel_path: sorted(items) for rel_path, items in sorted(failures.items())}
+
+
+def clear_validation_cache(failures_only: bool = False, db_path: str = DEFAULT_VALIDATION_CACHE_PATH) -> int:
+    if not os.path.exists(db_path):
+        print(f"No validation cache at {db_path}")
+        return 0
+    with ValidationCache(db_path) as cache:
+        removed = cache.clear(failures_only)
+    print(f"Removed {removed} cached {'failures' if failures_only else 'validation results'} from {db_path}")
+    return removed
+
+
+def validate_transpiled_output(transpiler: TranspilerModel, profile: str = "") -> Dict[str, List[Tuple[int, str, bool]]]:
+    """Validate the transpiler's .sql output and append failures to its error file."""
+    if not transpiler.warehouse:
+        raise ValueError("Validation needs a SQL warehouse ID to explain statements on")
+    with FileInventory() as inventory:
+        entries = inventory.scan(transpiler.output_folder, include=["*.sql"])
+    files = {entry.rel_path: entry.path for entry in entries}
+    if not files:
+        print(f"No SQL files to validate in {transpiler.output_folder}")
+        return {}
+
+    connector = DatabricksSqlConnector(transpiler.warehouse, profile, transpiler.catalog_name, transpiler.schema_name)
+    with ValidationCache() as cache:
+        failures = validate_statements(
+            files, transpiler.catalog_name, transpiler.schema_name, transpiler.warehouse, connector, cache
+        )
+
+    if not failures:
+        print("Validation passed for all statements")
+        return failures
+
+    with open(transpiler.error_file_path, "a", encoding="utf-8") as errors:
+        for rel_path, items in failures.items():
+            for stmt_no, message, cached in items:
+                errors.write(json.dumps({
+                    "type": "validation", "path": rel_path, "statement": stmt_no,
+                    "message": message, "cached": cached,
+                }) + "\n")
+    count = sum(len(items) for items in failures.values())
+    cached = sum(1 for items in failures.values() for item in items if item[2])
+    print(
+        f"Validation failed for {count} statements in {len(failures)} files "
+        f"({cached} known from earlier runs); details in {transpiler.error_file_path}"
+    )
+    return failures
@@ -0,0 +1,73 @@
+import os
+
+from service.artifact_service import STORE_DIR, ArtifactStore, collect_garbage, purge_legacy_outputs
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _objects(root):
+    return sorted(name for _, _, names in os.walk(root / STORE_DIR / "objects") for name in names)
+
+
+def test_publish_records_a_generation_only_when_content_changes(tmp_path):
+    view = str(tmp_path / "sub" / "modified_a.sql")
+    with ArtifactStore(str(tmp_path)) as store:
+        store.publish_text("SELECT 1;\n", view)
+        store.publish_text("SELECT 1;\n", view)
+        assert [generation for generation, _, _ in store.history(view)] == [1]
+
+        store.publish_text("SELECT 2;\n", view)
+        assert [generation for generation, _, _ in store.history(view)] == [2, 1]
+        assert _read(view) == "SELECT 2;\n"
+        assert store.current() == {"sub/modified_a.sql": store.history(view)[0][1]}
+    assert len(_objects(tmp_path)) == 2
+    assert not os.listdir(tmp_path / STORE_DIR / "tmp")
+
+
+def test_gc_keeps_the_latest_generations(tmp_path):
+    view = str(tmp_path / "modified_a.sql")
+    with ArtifactStore(str(tmp_path)) as store:
+        for n in range(4):
+            store.publish_text(f"SELECT {n};\n", view)
+        other = str(tmp_path / "modified_b.sql")
+        store.publish_text("SELECT 0;\n", other)  # Shares its object with generation 1 of a
+
+        assert store.gc(2) == (2, 1, len("SELECT 1;\n"))
+        assert [generation for generation, _, _ in store.history(view)] == [4, 3]
+        assert _read(view) == "SELECT 3;\n"
+        assert _read(other) == "SELECT 0;\n"
+
+        store.unpublish(other)
+        assert not os.path.lexists(other)
+        assert store.gc(2) == (0, 1, len("SELECT 0;\n"))
+    assert len(_objects(tmp_path)) == 2
+
+
+def test_collect_garbage_never_drops_the_current_generation(tmp_path, capsys):
+    view = str(tmp_path / "modified_a.sql")
+    with ArtifactStore(str(tmp_path)) as store:
+        store.publish_text("SELECT 1;\n", view)
+        store.publish_text("SELECT 2;\n", view)
+
+    collect_garbage(str(tmp_path), keep=0)
+    assert "dropped 1 generations, deleted 1 objects" in capsys.readouterr().out
+    assert _read(view) == "SELECT 2;\n"
+    assert len(_objects(tmp_path)) == 1
+
+
+def test_purge_legacy_outputs(tmp_path):
+    (tmp_path / "sub").mkdir()
+    legacy = ["modified_a_20240101_120000.sql", "sub/modified_b_20231231_235959.ipynb"]
+    kept = ["modified_a.sql", "modified_a_2024.sql", "a_20240101_120000.sql", "sub/modified_b.ipynb"]
+    for name in legacy + kept:
+        (tmp_path / name).write_text("x")
+    (tmp_path / STORE_DIR).mkdir()
+    (tmp_path / STORE_DIR / "modified_c_20240101_120000.sql").write_text("x")
+
+    assert purge_legacy_outputs(str(tmp_path)) == 2
+    assert all(os.path.exists(tmp_path / name) for name in kept)
+    assert not any(os.path.exists(tmp_path / name) for name in legacy)
+    assert os.path.exists(tmp_path / STORE_DIR / "modified_c_20240101_120000.sql")
@@ -0,0 +1,9 @@
+import pytest
+
+from main import DEFERRED_MODULES, STAGE_IMPORTS, _probe_interpreter
+
+
+@pytest.mark.parametrize("stage", sorted(STAGE_IMPORTS))
+def test_stage_defers_heavy_imports(stage):
+    _, loaded = _probe_interpreter(STAGE_IMPORTS[stage])
+    assert not set(DEFERRED_MODULES) & loaded
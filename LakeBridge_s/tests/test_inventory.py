@@ -0,0 +1,101 @@
+import os
+
+import service.modify_service as modify_service
+from models.modify_model import ModifyNotebookModel
+from service.inventory_service import FileInventory
+
+
+def test_read_only_scan_leaves_recorded_state_alone(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.sql").write_text("SELECT 1;")
+    (src / "b.sql").write_text("SELECT 2;")
+    db_path = str(tmp_path / "inventory.db")
+
+    with FileInventory(db_path) as inventory:
+        for entry in inventory.scan(str(src), include=["*.sql"]):
+            inventory.mark(entry, "modify", "done")
+
+    (src / "a.sql").write_text("SELECT 10;")
+    os.remove(src / "b.sql")
+    (src / "c.sql").write_text("SELECT 3;")
+    before = os.path.getmtime(db_path), os.path.getsize(db_path)
+
+    with FileInventory(db_path, read_only=True) as inventory:
+        entries = inventory.scan(str(src), include=["*.sql"])
+        assert [e.rel_path for e in entries] == ["a.sql", "c.sql"]
+        assert [e.rel_path for e in inventory.needing(entries, "modify")] == ["a.sql", "c.sql"]
+    assert (os.path.getmtime(db_path), os.path.getsize(db_path)) == before
+
+    # The real run still sees b.sql as removed and a.sql as changed
+    with FileInventory(db_path) as inventory:
+        entries = inventory.scan(str(src), include=["*.sql"])
+        assert [e.rel_path for e in inventory.needing(entries, "modify")] == ["a.sql", "c.sql"]
+
+
+def test_read_only_without_database(tmp_path):
+    (tmp_path / "a.sql").write_text("SELECT 1;")
+    db_path = str(tmp_path / "missing" / "inventory.db")
+    with FileInventory(db_path, read_only=True) as inventory:
+        entries = inventory.scan(str(tmp_path), include=["*.sql"])
+        assert [e.rel_path for e in inventory.needing(entries, "modify")] == ["a.sql"]
+    assert not os.path.exists(os.path.dirname(db_path))
+
+
+def test_done_file_is_pending_again_when_its_output_is_gone(tmp_path):
+    (tmp_path / "a.sql").write_text("SELECT 1;")
+    (tmp_path / "b.sql").write_text("SELECT 2;")
+    outputs = {"a.sql": True, "b.sql": False}
+    with FileInventory(str(tmp_path / "inventory.db")) as inventory:
+        entries = inventory.scan(str(tmp_path), include=["*.sql"])
+        for entry in entries:
+            inventory.mark(entry, "modify", "done")
+        assert inventory.needing(entries, "modify") == []
+        pending = inventory.needing(entries, "modify", lambda e: outputs[e.rel_path])
+        assert [e.rel_path for e in pending] == ["b.sql"]
+
+
+def test_reset_matches_derived_stage_keys(tmp_path):
+    (tmp_path / "a.sql").write_text("SELECT 1;")
+    with FileInventory(str(tmp_path / "inventory.db")) as inventory:
+        [entry] = inventory.scan(str(tmp_path), include=["*.sql"])
+        for stage in ("modify:/out:c.s", "modify:/out:template", "upload:/Workspace/x", "modify_extra"):
+            inventory.mark(entry, stage, "done")
+        assert inventory.reset(str(tmp_path), "modify") == 2
+        assert sorted(inventory.status(entry)) == ["modify_extra", "upload:/Workspace/x"]
+
+
+def test_modify_redoes_files_whose_output_was_deleted(tmp_path, monkeypatch):
+    src, out = tmp_path / "src", tmp_path / "out"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.sql").write_text("SELECT 1;")
+    (src / "sub" / "b.sql").write_text("SELECT 2;")
+    processed = []
+
+    def fake_process(cfg, sql_file, file_name, file_output_dir, catalog, schema, store):
+        processed.append(os.path.relpath(sql_file, src).replace(os.sep, "/"))
+        os.makedirs(file_output_dir, exist_ok=True)
+        path = modify_service._output_path(file_output_dir, file_name, ".sql")
+        with open(path, "w") as f:
+            f.write(f"-- {catalog}.{schema}\n")
+        return path
+
+    monkeypatch.setattr(modify_service, "_process_sql_file", fake_process)
+    cfg = ModifyNotebookModel(transpiled_dir=str(src), output_dir=str(out), llm_model="m", temperature=0)
+    with FileInventory(str(tmp_path / "inventory.db")) as inventory:
+        def run(force=False):
+            processed.clear()
+            modify_service.run_modify_and_create_notebooks(cfg, "c", "s", inventory, force=force)
+            return sorted(processed)
+
+        assert run() == ["a.sql", "sub/b.sql"]
+        assert run() == []
+        os.remove(out / "sub" / "modified_b.sql")
+        assert run() == ["sub/b.sql"]
+        assert run(force=True) == ["a.sql", "sub/b.sql"]
+
+        # A deleted source takes its output with it
+        os.remove(src / "a.sql")
+        assert run() == []
+        assert not os.path.exists(out / "modified_a.sql")
+        assert os.path.exists(out / "sub" / "modified_b.sql")
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from service.lineage_service import LineageIndex, extract_table_refs, show_lineage
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("CREATE TABLE c.s.t USING DELTA AS SELECT * FROM src",
+     [("create", "c.s.t"), ("select", "src")]),
+    ("SELECT EXTRACT(YEAR FROM o.ts) AS y FROM sales.orders o",
+     [("select", "sales.orders")]),
+    ("SELECT TRIM(BOTH ' ' FROM name) FROM people",
+     [("select", "people")]),
+    ("SELECT * FROM a JOIN b USING (id) WHERE id IN (SELECT id FROM c)",
+     [("select", "a"), ("select", "b"), ("select", "c")]),
+    ("MERGE INTO tgt t USING stage.src s ON t.id = s.id WHEN MATCHED THEN UPDATE SET a = s.a",
+     [("merge", "tgt"), ("select", "stage.src")]),
+    ("INSERT INTO t SELECT SUBSTRING(x FROM 2 FOR 3) FROM (SELECT x FROM raw) q",
+     [("insert", "t"), ("select", "raw")]),
+    ("WITH recent AS (SELECT * FROM base) SELECT * FROM recent",
+     [("select", "base")]),
+])
+def test_extract_table_refs(statement, expected):
+    assert extract_table_refs(statement) == expected
+
+
+def test_prune_drops_sources_no_longer_seen(tmp_path):
+    for name, sql in {"a.sql": "CREATE TABLE a AS SELECT 1;", "b.sql": "SELECT * FROM a;"}.items():
+        (tmp_path / name).write_text(sql)
+    with LineageIndex(str(tmp_path / "lineage.db")) as index:
+        index.update_file("a.sql", str(tmp_path / "a.sql"))
+        index.update_file("b.sql", str(tmp_path / "b.sql"))
+        assert index.execution_waves() == [["a.sql"], ["b.sql"]]
+
+        assert index.prune({"b.sql"}) == ["a.sql"]
+        assert index.files_for_table("a") == [("b.sql", str(tmp_path / "b.sql"), 1, "select")]
+        assert index.execution_waves() == [["b.sql"]]
+
+
+def test_paths_are_stored_relative_to_the_index(tmp_path, monkeypatch):
+    out = tmp_path / "out"
+    (out / "sub").mkdir(parents=True)
+    (out / "sub" / "modified_a.sql").write_text("INSERT INTO sales.orders SELECT * FROM staging.orders;")
+    monkeypatch.chdir(tmp_path)
+    with LineageIndex(os.path.join("out", "lineage.db")) as index:
+        index.update_file("sub/a.sql", os.path.join("out", "sub", "modified_a.sql"))
+        stored = index._conn.execute("SELECT sql_path FROM files").fetchone()[0]
+    assert stored == os.path.join("sub", "modified_a.sql")
+
+    # Opened from elsewhere, and after moving the output directory, paths still resolve
+    moved = tmp_path / "moved"
+    os.rename(out, moved)
+    monkeypatch.chdir(moved / "sub")
+    with LineageIndex(str(moved / "lineage.db")) as index:
+        assert index.sql_outputs() == {"sub/a.sql": str(moved / "sub" / "modified_a.sql")}
+        assert index.files_for_table("sales.orders") == [("sub/a.sql", str(moved / "sub" / "modified_a.sql"), 1, "insert")]
+
+
+def test_show_lineage(tmp_path, capsys):
+    (tmp_path / "modified_a.sql").write_text("CREATE TABLE t AS SELECT * FROM src;")
+    with LineageIndex(str(tmp_path / "lineage.db")) as index:
+        index.update_file("a.sql", str(tmp_path / "modified_a.sql"))
+    show_lineage(str(tmp_path), table="t", source="a.sql")
+    out = capsys.readouterr().out
+    assert "1 statements touch t:" in out and "create  a.sql (statement 1)" in out
+    assert "a.sql touches 2 tables:" in out and "select  src" in out
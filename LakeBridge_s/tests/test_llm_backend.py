@@ -0,0 +1,94 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from service.llm_backend import LocalBackend
+
+WORDS = ["```sql\n", "SELECT * ", "FROM c.s.t;\n", "```\n", "Done."]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.payloads.append(payload)
+        usage = {"prompt_tokens": 11, "completion_tokens": 5}
+        if not payload["stream"]:
+            body = json.dumps({"choices": [{"message": {"content": "".join(WORDS)}}], "usage": usage}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [{"choices": [{"delta": {"content": word}}]} for word in WORDS]
+        if payload.get("stream_options", {}).get("include_usage"):
+            events.append({"choices": [], "usage": usage})
+        for event in [f"data: {json.dumps(e)}\n\n" for e in events] + ["data: [DONE]\n\n"]:
+            data = event.encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture
+def backend():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.connections = set()
+    server.payloads = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    backend = LocalBackend(f"http://127.0.0.1:{server.server_address[1]}/v1")
+    backend.server = server
+    yield backend
+    server.shutdown()
+    server.server_close()
+
+
+def _complete(backend, stream):
+    return backend.create_completion(
+        model="m", messages=[{"role": "user", "content": "Qualify the table names"}],
+        temperature=0, max_completion_tokens=100, top_p=1, stream=stream,
+    )
+
+
+def test_requests_share_one_connection(backend):
+    assert _complete(backend, False).choices[0].message.content == "".join(WORDS)
+    stream = _complete(backend, True)
+    assert "".join(c.choices[0].delta.content for c in stream if c.choices) == "".join(WORDS)
+    stream.close()
+    _complete(backend, False)
+    assert len(backend.server.connections) == 1
+
+
+def test_stream_requests_and_records_usage(backend):
+    stream = _complete(backend, True)
+    list(stream)
+    stream.close()
+    assert backend.server.payloads[0]["stream_options"] == {"include_usage": True}
+    assert (backend.stats.prompt_tokens, backend.stats.completion_tokens) == (11, 5)
+    assert backend.stats.estimated_calls == 0
+
+
+def test_stream_closed_early_estimates_usage(backend):
+    stream = _complete(backend, True)
+    for chunk in stream:
+        if chunk.choices[0].delta.content == "```\n":
+            break
+    stream.close()
+    assert backend.stats.calls == 1 and backend.stats.estimated_calls == 1
+    assert backend.stats.prompt_tokens > 0 and backend.stats.completion_tokens > 0
+    # The abandoned response cannot be reused; the next request opens a new connection
+    _complete(backend, False)
+    assert len(backend.server.connections) == 2
@@ -0,0 +1,29 @@
+import pytest
+
+from main import build_parser, run_all, run_modify, run_upload
+
+
+@pytest.mark.parametrize("argv, func", [
+    (["modify", "--plan"], run_modify),
+    (["--plan", "modify"], run_modify),
+    (["upload", "--plan"], run_upload),
+    (["all", "--plan"], run_all),
+])
+def test_plan_flag_before_or_after_subcommand(argv, func):
+    args = build_parser().parse_args(argv)
+    assert args.plan and args.func is func
+
+
+def test_plan_defaults_off():
+    assert not build_parser().parse_args(["modify"]).plan
+
+
+@pytest.mark.parametrize("argv", [["modify", "--force"], ["--force", "upload"], ["all", "--force"]])
+def test_force_flag_before_or_after_subcommand(argv):
+    args = build_parser().parse_args(argv)
+    assert args.force and not args.plan
+
+
+def test_reset_subcommand():
+    args = build_parser().parse_args(["reset", "./transpiled", "--stage", "modify"])
+    assert (args.root, args.stage) == ("./transpiled", "modify")
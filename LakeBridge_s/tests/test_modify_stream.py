@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from service.artifact_service import ArtifactStore
+from service.modify_service import (
+    _MalformedResponseError,
+    _StreamingSqlCleaner,
+    _StreamingSqlWriter,
+    _clean_sql_output,
+    _split_sql_statements,
+)
+
+RESPONSES = {
+    "fenced": "```sql\nCREATE TABLE c.s.t (id INT);\nINSERT INTO c.s.t VALUES (1);\n```\n",
+    "prose around fence": (
+        "Here is the modified script:\n\n```sql\nSELECT * FROM c.s.orders;\n"
+        "SELECT ';' AS semi FROM c.s.items;\n```\nLet me know if you need more changes.\n"
+    ),
+    "prose starting with a keyword": (
+        "With the qualified names, here is the script:\n```sql\n"
+        "WITH x AS (SELECT 1 AS a) SELECT a FROM x;\n```\n"
+    ),
+    "prose with keyword and identifier": (
+        "Select statements now use c.s names:\n```\nSELECT id FROM c.s.t;\n```\n"
+    ),
+    "bare": "CREATE TABLE c.s.t (id INT);\n\nINSERT INTO c.s.t\nSELECT id FROM c.s.src;\n",
+    "bare without terminator": "SELECT id\nFROM c.s.t\nWHERE id > 1",
+    "descriptor then bare": "# Modified SQL from: orders.sql\nSELECT * FROM c.s.orders;\n",
+    "triple quoted": '"""\nUPDATE c.s.t SET a = 1;\nDELETE FROM c.s.t WHERE a = 2;\n"""',
+    "unclosed fence": "```sql\nSELECT 1;\nSELECT 2;\n",
+}
+
+
+def _stream(text, chunk_size):
+    cleaner = _StreamingSqlCleaner()
+    statements = []
+    for i in range(0, len(text), chunk_size):
+        statements.extend(cleaner.feed(text[i:i + chunk_size]))
+        if cleaner.done:
+            break
+    return statements + cleaner.finish()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10000])
+@pytest.mark.parametrize("name", sorted(RESPONSES))
+def test_streamed_statements_match_clean_sql_output(name, chunk_size):
+    text = RESPONSES[name]
+    assert _stream(text, chunk_size) == _split_sql_statements(_clean_sql_output(text))
+
+
+def test_prose_is_rejected():
+    with pytest.raises(_MalformedResponseError):
+        _stream("I'm sorry, I can't help with that request.\n" * 100, 64)
+
+
+def test_writers_for_the_same_file_do_not_share_spills(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    first = _StreamingSqlWriter("orders.sql", str(tmp_path), store)
+    second = _StreamingSqlWriter("orders.sql", str(tmp_path), store)
+    first.write("SELECT 1")
+    second.write("SELECT 2")
+    first.discard()
+    with open(second.commit(), encoding="utf-8") as f:
+        assert f.read() == "SELECT 2\n"
+    store.close()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
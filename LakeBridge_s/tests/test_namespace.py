@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from models.modify_model import NamespaceTarget
+from service.namespace_service import (
+    CATALOG_PLACEHOLDER,
+    SCHEMA_PLACEHOLDER,
+    _is_template,
+    default_target_dir,
+    render_targets,
+    render_text,
+)
+
+TEMPLATE = f"INSERT INTO {CATALOG_PLACEHOLDER}.{SCHEMA_PLACEHOLDER}.orders SELECT 1;\n"
+
+
+@pytest.mark.parametrize("catalog, schema, expected", [
+    ("main", "sales", "main.sales.orders"),
+    ("dev-main", "sales_2", "`dev-main`.sales_2.orders"),
+    ("main", "odd`name", "main.`odd``name`.orders"),
+    ("main", "1st", "main.`1st`.orders"),
+])
+def test_render_text_quotes_names_that_need_it(catalog, schema, expected):
+    text = f"SELECT * FROM {CATALOG_PLACEHOLDER}.{SCHEMA_PLACEHOLDER}.orders"
+    assert render_text(text, NamespaceTarget(catalog, schema, "")) == f"SELECT * FROM {expected}"
+
+
+@pytest.mark.parametrize("sql, expected", [
+    (TEMPLATE, True),
+    ("SELECT 1;\nSET spark.sql.shuffle.partitions = 8;\n", True),
+    ("INSERT INTO main.sales.orders SELECT 1;\n", False),
+])
+def test_is_template(tmp_path, sql, expected):
+    path = tmp_path / "modified_a.sql"
+    path.write_text(sql)
+    assert _is_template(str(path)) is expected
+
+
+def test_default_target_dir_is_a_sibling(tmp_path):
+    output_dir = str(tmp_path / "transpiled")
+    target_dir = default_target_dir(output_dir + os.sep, "main", "sales")
+    assert target_dir == str(tmp_path / "transpiled_main.sales")
+    assert os.path.dirname(target_dir) == str(tmp_path)
+
+
+def test_render_targets_refuses_missing_templates_and_removes_stale_outputs(tmp_path, capsys):
+    root = tmp_path / "templates"
+    (root / "sub").mkdir(parents=True)
+    (root / "sub" / "modified_a.sql").write_text(TEMPLATE)
+    target = NamespaceTarget("main", "sales", str(tmp_path / "out"))
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "modified_gone.sql").write_text("SELECT 1;")
+    (tmp_path / "out" / "notes.txt").write_text("kept")
+
+    refused = render_targets(str(root), {
+        "sub/a.sql": str(root / "sub" / "modified_a.sql"),
+        "b.sql": str(root / "modified_b.sql"),
+    }, [target])
+
+    assert refused == ["b.sql"]
+    assert "template " + str(root / "modified_b.sql") + " is missing" in capsys.readouterr().out
+    assert (tmp_path / "out" / "sub" / "modified_a.sql").read_text() == "INSERT INTO main.sales.orders SELECT 1;\n"
+    assert not (tmp_path / "out" / "modified_gone.sql").exists()
+    assert (tmp_path / "out" / "notes.txt").exists()
@@ -0,0 +1,127 @@
+import sqlite3
+
+import pytest
+
+from models.reconcile_model import ReconcilerModel, TableMapping
+from service import reconcile_service
+from service.reconcile_connectors import SQLiteConnector
+from service.reconcile_service import reconcile_table
+
+ROWS = [
+    (i, f"name {i}", i * 1.5, i % 2, bytes([i % 256]) if i % 7 else None)
+    for i in range(1, 201)
+]
+
+
+class CountingConnector(SQLiteConnector):
+    """SQLite connector that records how many rows it hands back to Python."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.rows_read = 0
+
+    def iter_rows(self, *args, **kwargs):
+        for row in super().iter_rows(*args, **kwargs):
+            self.rows_read += 1
+            yield row
+
+
+def _make_db(path, rows):
+    conn = sqlite3.connect(path)
+    # No primary key: reconcile must also cope with a key column that is not unique
+    conn.execute("CREATE TABLE orders (id INTEGER, name TEXT, amount REAL, flag INTEGER, payload BLOB)")
+    conn.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return CountingConnector(str(path))
+
+
+def _reconcile(tmp_path, source_rows, target_rows, partitions=4):
+    source = _make_db(tmp_path / "source.db", source_rows)
+    target = _make_db(tmp_path / "target.db", target_rows)
+    cfg = ReconcilerModel(profile_name="", target="", partitions=partitions, workers=2)
+    result = reconcile_table(cfg, source, target, TableMapping("orders", "orders", "id"))
+    assert not result.error
+    return result, source, target
+
+
+def test_matching_tables_transfer_no_rows(tmp_path):
+    result, source, target = _reconcile(tmp_path, ROWS, list(reversed(ROWS)))
+    assert result.ok
+    assert result.partitions_compared == 4
+    assert source.rows_read == target.rows_read == 0
+
+
+def test_changed_row(tmp_path):
+    target_rows = [row if row[0] != 42 else (42, "name 42", 99.0, 0, b"*") for row in ROWS]
+    result, source, target = _reconcile(tmp_path, ROWS, target_rows)
+    assert not result.ok
+    assert result.changed == [{"key": "42", "columns": ["amount", "payload"]}]
+    assert not result.missing_in_target and not result.missing_in_source
+    assert len(result.mismatched_partitions) == 1
+    # Only the mismatched partition is read row by row
+    assert source.rows_read == 50
+
+
+def test_null_differs_from_value(tmp_path):
+    target_rows = [row if row[0] != 7 else (7, "name 7", 10.5, 1, b"\x07") for row in ROWS]
+    result, _, _ = _reconcile(tmp_path, ROWS, target_rows)
+    assert result.changed == [{"key": "7", "columns": ["payload"]}]
+
+
+def test_row_missing_in_target(tmp_path):
+    result, _, _ = _reconcile(tmp_path, ROWS, [row for row in ROWS if row[0] != 150])
+    assert (result.source_count, result.target_count) == (200, 199)
+    assert result.missing_in_target == ["150"]
+    assert not result.missing_in_source and not result.changed
+
+
+def test_row_missing_in_source(tmp_path):
+    result, _, _ = _reconcile(tmp_path, [row for row in ROWS if row[0] != 3], ROWS)
+    assert result.missing_in_source == ["3"]
+    assert not result.missing_in_target and not result.changed
+
+
+def test_drilldown_narrows_large_partitions(tmp_path, monkeypatch):
+    monkeypatch.setattr(reconcile_service, "_DRILLDOWN_ROWS", 10)
+    target_rows = [row if row[0] != 137 else (137, "renamed", 205.5, 1, row[4]) for row in ROWS]
+    result, source, _ = _reconcile(tmp_path, ROWS, target_rows)
+    assert result.changed == [{"key": "137", "columns": ["name"]}]
+    assert result.partitions_compared > 4
+    [(lower, upper, _)] = result.mismatched_partitions
+    assert lower <= 137 <= upper and upper - lower < 50
+    assert source.rows_read <= 10
+
+
+def test_duplicate_keys_stop_the_drilldown(tmp_path, monkeypatch):
+    monkeypatch.setattr(reconcile_service, "_DRILLDOWN_ROWS", 10)
+    duplicates = [(100, f"copy {i}", 1.0, 0, None) for i in range(30)]
+    target_duplicates = duplicates[:-1] + [(100, "edited", 1.0, 0, None), (100, "extra", 1.0, 0, None)]
+    result, source, _ = _reconcile(tmp_path, ROWS + duplicates, ROWS + target_duplicates)
+    assert result.missing_in_target == ["100"]
+    assert result.missing_in_source == ["100", "100"]
+    assert not result.changed
+    [(lower, upper, _)] = result.mismatched_partitions
+    assert lower <= 100 <= upper and upper - lower <= 1
+    assert source.rows_read == 31
+
+
+def test_sqlite_and_duckdb_hash_rows_alike(tmp_path):
+    duckdb = pytest.importorskip("duckdb")
+    from service.reconcile_connectors import DuckDBConnector
+
+    path = str(tmp_path / "target.duckdb")
+    conn = duckdb.connect(path)
+    conn.execute("CREATE TABLE orders (id BIGINT, name VARCHAR, amount DOUBLE, flag BOOLEAN, payload BLOB)")
+    conn.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?, ?, ?)",
+        [(i, name, amount, bool(flag), payload) for i, name, amount, flag, payload in ROWS],
+    )
+    conn.close()
+
+    source = _make_db(tmp_path / "source.db", ROWS)
+    cfg = ReconcilerModel(profile_name="", target="", partitions=4, workers=2)
+    result = reconcile_table(cfg, source, DuckDBConnector(path), TableMapping("orders", "orders", "id"))
+    assert not result.error
+    assert result.ok
+    assert source.rows_read == 0
@@ -0,0 +1,71 @@
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+from service.scheduling import CostModel, assign_shards, load_analyzer_weights, longest_first
+
+
+def _write_xlsx(path, *sheets):
+    """Minimal workbook with inline-string cells, enough for _read_xlsx_rows."""
+    with zipfile.ZipFile(path, "w") as archive:
+        for number, rows in enumerate(sheets, start=1):
+            xml_rows = []
+            for r, row in enumerate(rows, start=1):
+                cells = "".join(
+                    f'<c r="{chr(ord("A") + c)}{r}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+                    for c, value in enumerate(row)
+                )
+                xml_rows.append(f'<row r="{r}">{cells}</row>')
+            archive.writestr(
+                f"xl/worksheets/sheet{number}.xml",
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<sheetData>{"".join(xml_rows)}</sheetData></worksheet>',
+            )
+    return str(path)
+
+
+def test_prefers_file_name_and_complexity_columns(tmp_path):
+    report = _write_xlsx(tmp_path / "report.xlsx", [
+        ["Object Type", "Lines", "File Name", "Complexity"],
+        ["PROCEDURE", "900", r"C:\src\Orders.sql", "COMPLEX"],
+        ["VIEW", "10", "src/items.sql", "LOW"],
+    ])
+    assert load_analyzer_weights(report) == {"orders.sql": 4.0, "items.sql": 1.0}
+
+
+def test_numeric_scores_are_scaled_to_the_median(tmp_path):
+    report = _write_xlsx(
+        tmp_path / "report.xlsx",
+        [["Summary"], ["nothing here"]],
+        [["Script", "Statements"], ["a.sql", "10"], ["b.sql", "20"], ["c.sql", "40"], ["d.sql", ""]],
+    )
+    assert load_analyzer_weights(report) == {"a.sql": 0.5, "b.sql": 1.0, "c.sql": 2.0}
+
+
+def test_cost_weighs_generated_outputs_like_their_source(tmp_path):
+    report = _write_xlsx(tmp_path / "report.xlsx", [["File", "Complexity"], ["orders.sql", "VERY COMPLEX"]])
+    (tmp_path / "modified_orders_20240101_120000.sql").write_text("x" * 10)
+    (tmp_path / "items.sql").write_text("x" * 10)
+    costs = CostModel(report)
+    assert costs.cost(str(tmp_path / "modified_orders_20240101_120000.sql")) == 80
+    assert costs.cost(str(tmp_path / "items.sql")) == 10
+
+
+def test_longest_first():
+    assert longest_first(["b", "ccc", "a", "dd"], len) == ["ccc", "dd", "b", "a"]
+
+
+@pytest.mark.parametrize("shards", [1, 3, 10])
+def test_assign_shards_balances_cost(shards):
+    items = [8, 7, 6, 5, 4, 3, 2, 1]
+    buckets = assign_shards(items, float, shards)
+    assert len(buckets) == min(shards, len(items))
+    assert sorted(x for bucket in buckets for x in bucket) == sorted(items)
+    if shards == 3:
+        # Longest processing time first: within a third of the 12/12/12 optimum
+        assert sorted(sum(bucket) for bucket in buckets) == [11, 12, 13]
+
+
+def test_assign_shards_without_items():
+    assert assign_shards([], float, 4) == []
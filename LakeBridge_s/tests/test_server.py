@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+import service.server_service as server_service
+from service.inventory_service import FileInventory
+
+
+@pytest.fixture
+def job_service(tmp_path, monkeypatch):
+    """A service whose modify runs wait for release and fail the files named in the job's input_path."""
+    release = threading.Event()
+
+    def fake_modify(cfg, catalog, schema, inventory=None, costs=None, results=None):
+        release.wait(5)
+        for name in ("a.sql", "b.sql"):
+            results[name] = {"status": "failed" if name in cfg.transpiled_dir else "done", "seconds": 0.0}
+        return results
+
+    monkeypatch.setattr(server_service, "run_modify_and_create_notebooks", fake_modify)
+    service = server_service.JobService(workers=1, inventory=FileInventory(str(tmp_path / "inventory.db")))
+    monkeypatch.setattr(service.metadata, "validate", lambda catalog, schema: None)
+    service.release = release
+    yield service
+    release.set()
+    service.close()
+
+
+def _wait(service):
+    service.release.set()
+    service._queue.join()
+
+
+def test_submit_and_status(job_service, tmp_path):
+    job = job_service.submit({"input_path": str(tmp_path / "src"), "catalog": "c", "schema": "s"})
+    assert job.status in ("queued", "running")
+    assert job.config.output_dir == str(tmp_path / "src") + "_c.s"
+    _wait(job_service)
+    assert job_service.get(job.id).status == "done"
+    assert job.to_dict()["files_processed"] == 2
+    assert job_service.status()["jobs"] == {"done": 1}
+
+
+def test_job_fails_when_a_file_fails(job_service, tmp_path):
+    job = job_service.submit({"input_path": str(tmp_path / "b.sql"), "catalog": "c", "schema": "s"})
+    _wait(job_service)
+    assert job.status == "failed"
+    assert job.error == "1 of 2 files failed: b.sql"
+
+
+def test_second_job_on_a_busy_output_dir_is_rejected(job_service, tmp_path):
+    payload = {"input_path": str(tmp_path / "src"), "output_dir": str(tmp_path / "out"), "catalog": "c", "schema": "s"}
+    first = job_service.submit(payload)
+    with pytest.raises(ValueError, match=f"Job {first.id} is (queued|running)"):
+        job_service.submit(payload)
+    # A target rendered into the busy directory conflicts as well
+    with pytest.raises(ValueError, match=first.id):
+        job_service.submit({"input_path": str(tmp_path / "other"),
+                            "targets": [{"catalog": "c", "schema": "s", "output_dir": str(tmp_path / "out")}]})
+    _wait(job_service)
+    # Once it has finished the same namespace may run there again, another one may not
+    assert job_service.submit(payload).status in ("queued", "running")
+    _wait(job_service)
+    with pytest.raises(ValueError, match="holds c.s outputs"):
+        job_service.submit({**payload, "schema": "t"})
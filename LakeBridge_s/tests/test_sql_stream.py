@@ -0,0 +1,83 @@
+import pytest
+
+from service.sql_stream import StatementScanner, iter_sql_file_statements, iter_statement_batches
+
+SCRIPT = (
+    "-- header; don't split here\n"
+    "CREATE TABLE t (a STRING); /* block; with 'quote */\n"
+    "INSERT INTO t VALUES ('x;y', 'it''s', 'back\\'slash;');\n"
+    "SELECT '--not a comment;' FROM t -- trailing; comment\n"
+    "WHERE a = '/*'; SELECT 3"
+)
+STATEMENTS = [
+    "-- header; don't split here\nCREATE TABLE t (a STRING);",
+    "/* block; with 'quote */\nINSERT INTO t VALUES ('x;y', 'it''s', 'back\\'slash;');",
+    "SELECT '--not a comment;' FROM t -- trailing; comment\nWHERE a = '/*';",
+    "SELECT 3;",
+]
+
+
+def _write(tmp_path, text, newline="\n"):
+    path = tmp_path / "script.sql"
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    return str(path)
+
+
+def _scan_in_pieces(text, size):
+    scanner = StatementScanner()
+    ends = []
+    for offset in range(0, len(text), size):
+        ends.extend(offset + end for end in scanner.scan(text[offset:offset + size]))
+    return ends
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 1000])
+def test_scanner_state_carries_across_pieces(size):
+    assert _scan_in_pieces(SCRIPT, size) == list(StatementScanner().scan(SCRIPT))
+    assert len(_scan_in_pieces(SCRIPT, size)) == 3
+
+
+def test_scanner_works_on_bytes():
+    data = SCRIPT.encode("utf-8")
+    assert list(StatementScanner().scan(data)) == list(StatementScanner().scan(SCRIPT))
+
+
+def test_semicolons_in_quotes_and_comments(tmp_path):
+    assert list(iter_sql_file_statements(_write(tmp_path, SCRIPT))) == STATEMENTS
+
+
+def test_crlf_line_endings(tmp_path):
+    statements = list(iter_sql_file_statements(_write(tmp_path, SCRIPT, "\r\n")))
+    assert [s.replace("\r\n", "\n") for s in statements] == STATEMENTS
+    assert not any(s.startswith(("\r", "\n")) or s.endswith(("\r", "\n")) for s in statements)
+
+
+def test_trailing_statement_gets_a_semicolon(tmp_path):
+    assert list(iter_sql_file_statements(_write(tmp_path, "SELECT 1;\n\nSELECT 2\n  \n"))) == ["SELECT 1;", "SELECT 2;"]
+
+
+@pytest.mark.parametrize("text", ["", "  \n\r\n"])
+def test_empty_files(tmp_path, text):
+    path = _write(tmp_path, text)
+    assert list(iter_sql_file_statements(path)) == []
+    assert list(iter_statement_batches(path, 100)) == []
+
+
+def test_multibyte_text(tmp_path):
+    path = _write(tmp_path, "SELECT 'café;crème';\nSELECT '日本';")
+    assert list(iter_sql_file_statements(path)) == ["SELECT 'café;crème';", "SELECT '日本';"]
+
+
+def test_batch_boundaries(tmp_path):
+    # Each statement is 9 characters and counts 11 with its separator
+    path = _write(tmp_path, "SELECT 1;SELECT 2;SELECT 3;SELECT 4;SELECT 5;")
+    assert list(iter_statement_batches(path, 31)) == [
+        "SELECT 1;\n\nSELECT 2;\n\nSELECT 3;", "SELECT 4;\n\nSELECT 5;",
+    ]
+    # A batch is closed before it would exceed batch_chars, not after
+    assert list(iter_statement_batches(path, 30)) == [
+        "SELECT 1;\n\nSELECT 2;", "SELECT 3;\n\nSELECT 4;", "SELECT 5;",
+    ]
+    # Statements longer than batch_chars are never split
+    assert list(iter_statement_batches(path, 5)) == [f"SELECT {n};" for n in range(1, 6)]
+    assert list(iter_statement_batches(path, 1000)) == ["\n\n".join(f"SELECT {n};" for n in range(1, 6))]
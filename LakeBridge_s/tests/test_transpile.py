@@ -0,0 +1,51 @@
+import os
+import shutil
+
+import service.transpile_service as transpile_service
+from models.transpile_model import TranspilerModel
+from service.inventory_service import FileInventory
+
+
+class FakeTranspiler:
+    """Stands in for the transpiler process: copies the shard into the output folder."""
+    calls = []
+
+    def __init__(self, command):
+        source = command[command.index("--input-source") + 1]
+        output = command[command.index("--output-folder") + 1]
+        files = sorted(
+            os.path.relpath(os.path.join(d, n), source).replace(os.sep, "/")
+            for d, _, names in os.walk(source) for n in names
+        )
+        FakeTranspiler.calls.append(files)
+        shutil.copytree(source, output, dirs_exist_ok=True)
+
+    def wait(self):
+        return 0
+
+
+def test_sharded_run_skips_unchanged_and_excluded_files(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    for name in ("a.sql", "b.sql", "sub/c.sql", "notes.txt"):
+        (src / name).write_text(f"SELECT '{name}';")
+    monkeypatch.setattr(transpile_service.subprocess, "Popen", FakeTranspiler)
+    transpiler = TranspilerModel(
+        source_dialect="tsql", input_source=str(src), output_folder=str(tmp_path / "out"),
+        error_file_path=str(tmp_path / "errors.log"), catalog_name="c", schema_name="s",
+        validate="false", warehouse="", override="", open_config="", workers=2,
+        include_globs=["*.sql"],
+    )
+
+    def run():
+        FakeTranspiler.calls = []
+        with FileInventory(str(tmp_path / "inventory.db")) as inventory:
+            assert transpile_service._run_sharded(transpiler, inventory)
+        return sorted(f for files in FakeTranspiler.calls for f in files)
+
+    assert run() == ["a.sql", "b.sql", "sub/c.sql"]
+    assert len(FakeTranspiler.calls) == 2
+    assert run() == []
+    (src / "a.sql").write_text("SELECT 'changed';")
+    os.remove(tmp_path / "out" / "sub" / "c.sql")
+    assert run() == ["a.sql", "sub/c.sql"]
@@ -0,0 +1,51 @@
+import pytest
+
+from models.transpile_model import TranspilerModel
+from service import helper
+from service.validation_service import ValidationCache, normalize_statement, validate_transpiled_output
+
+NAMESPACE = ("main", "sales", "wh1")
+
+
+def test_normalize_statement_ignores_case_comments_and_spacing():
+    assert normalize_statement("SELECT  *\n-- all\nFROM t WHERE a = 'X';") == normalize_statement("select * from t where a = 'X'")
+    assert normalize_statement("SELECT 'X'") != normalize_statement("SELECT 'x'")
+
+
+def test_failures_expire(tmp_path):
+    with ValidationCache(str(tmp_path / "cache.db"), failure_ttl=3600, missing_ttl=-1) as cache:
+        cache.store("ok", *NAMESPACE, True, "")
+        cache.store("syntax", *NAMESPACE, False, "[PARSE_SYNTAX_ERROR] Syntax error at or near 'FORM'")
+        cache.store("missing", *NAMESPACE, False, "[TABLE_OR_VIEW_NOT_FOUND] The table `orders` cannot be found")
+        assert set(cache.lookup(["ok", "syntax", "missing"], *NAMESPACE)) == {"ok", "syntax"}
+
+    with ValidationCache(str(tmp_path / "cache.db"), failure_ttl=-1, missing_ttl=-1) as cache:
+        assert set(cache.lookup(["ok", "syntax", "missing"], *NAMESPACE)) == {"ok"}
+
+
+def test_clear(tmp_path):
+    with ValidationCache(str(tmp_path / "cache.db")) as cache:
+        cache.store("ok", *NAMESPACE, True, "")
+        cache.store("syntax", *NAMESPACE, False, "Syntax error")
+        assert cache.clear(failures_only=True) == 1
+        assert set(cache.lookup(["ok", "syntax"], *NAMESPACE)) == {"ok"}
+        assert cache.clear() == 1
+        assert cache.lookup(["ok"], *NAMESPACE) == {}
+
+
+def test_validation_requires_a_warehouse(tmp_path):
+    transpiler = TranspilerModel(
+        source_dialect="tsql", input_source="", output_folder=str(tmp_path), error_file_path="",
+        catalog_name="main", schema_name="sales", validate="true", warehouse="", override="", open_config="",
+    )
+    with pytest.raises(ValueError, match="warehouse"):
+        validate_transpiled_output(transpiler)
+
+
+def test_warehouse_prompt_has_no_default_when_required(monkeypatch):
+    answers = iter(["", ""])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    assert helper.get_warehouse() == ""
+    with pytest.raises(StopIteration):
+        # Keeps asking instead of falling back to a placeholder
+        helper.get_warehouse(required=True)